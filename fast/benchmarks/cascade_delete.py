@@ -0,0 +1,80 @@
+import sys
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from benchmarks.common import (
+    benchmark_engine,
+    build_parser,
+    finish,
+    new_results,
+    summarize,
+)
+from fast.database import delete_author_cascade
+from fast.models import Author, Book
+
+
+def seed_author(session, books):
+    author_id = session.scalar(
+        insert(Author)
+        .values(name=f'prolific {time.time_ns()}')
+        .returning(Author.id)
+    )
+    session.execute(
+        insert(Book),
+        [
+            {'year': 2000, 'title': f'book {index}', 'author_id': author_id}
+            for index in range(books)
+        ],
+    )
+    session.commit()
+    return author_id
+
+
+def orm_cascade(session, author_id):
+    session.delete(
+        session.scalar(select(Author).where(Author.id == author_id))
+    )
+
+
+def time_deletes(engine, delete, books, iterations):
+    latencies = []
+    for _ in range(iterations):
+        with Session(engine) as session:
+            author_id = seed_author(session, books)
+
+            start = time.perf_counter()
+            delete(session, author_id)
+            session.commit()
+            latencies.append(time.perf_counter() - start)
+
+    return summarize(latencies, sum(latencies))
+
+
+def main(argv=None):
+    parser = build_parser('Benchmark deleting an author with many books.')
+    parser.add_argument('--books', type=int, default=50_000)
+    parser.set_defaults(requests=3)
+    args = parser.parse_args(argv)
+
+    with benchmark_engine(args.database_url) as engine:
+        results = new_results(
+            'cascade_delete',
+            engine,
+            books=args.books,
+            iterations=args.requests,
+        )
+        for name, delete in (
+            ('orm_cascade', orm_cascade),
+            ('bulk_delete', delete_author_cascade),
+        ):
+            results['scenarios'][name] = time_deletes(
+                engine, delete, args.books, args.requests
+            )
+
+    return finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import random
+import sys
+
+import factory.random
+from sqlalchemy.orm import Session
+
+from benchmarks.common import (
+    benchmark_client,
+    benchmark_engine,
+    build_parser,
+    finish,
+    measure,
+    new_results,
+)
+from fast.models import User
+from fast.security import get_password_hash
+from tests.factories import AuthorFactory, BookFactory
+
+EMAIL = 'benchmark@example.com'
+PASSWORD = 'benchmark'
+
+
+def seed_catalog(engine, authors, books_per_author, seed):
+    factory.random.reseed_random(seed)
+    AuthorFactory.reset_sequence()
+    BookFactory.reset_sequence()
+
+    with Session(engine, expire_on_commit=False) as session:
+        db_authors = AuthorFactory.build_batch(authors)
+        session.add_all(db_authors)
+        session.flush()
+
+        books = [
+            BookFactory.build(author_id=author.id)
+            for author in db_authors
+            for _ in range(books_per_author)
+        ]
+        session.add_all(books)
+        session.add(
+            User(
+                username='benchmark',
+                email=EMAIL,
+                password=get_password_hash(PASSWORD),
+            )
+        )
+        session.commit()
+
+    return [author.id for author in db_authors], [book.year for book in books]
+
+
+def catalog_requests(client, author_ids, years, seed):
+    rng = random.Random(seed)
+    book_count = len(years)
+    credentials = {'username': EMAIL, 'password': PASSWORD}
+    token = client.post('/auth/token', data=credentials).json()
+    headers = {'Authorization': f'Bearer {token["access_token"]}'}
+
+    return {
+        'list_books_by_title': lambda index: client.get(
+            '/books/',
+            params={'title': f'ção{rng.randrange(100)}', 'limit': 20},
+        ),
+        'list_books_by_year': lambda index: client.get(
+            '/books/', params={'year': rng.choice(years), 'limit': 20}
+        ),
+        'read_book': lambda index: client.get(
+            f'/books/{rng.randint(1, book_count)}'
+        ),
+        'create_book': lambda index: client.post(
+            '/books/',
+            json={
+                'year': 2000,
+                'title': f'benchmark {index}',
+                'author_id': rng.choice(author_ids),
+            },
+            headers=headers,
+        ),
+        'auth_token': lambda index: client.post(
+            '/auth/token', data=credentials
+        ),
+        'patch_author': lambda index: client.patch(
+            f'/authors/{rng.choice(author_ids)}',
+            json={'name': f'benchmark author {index}'},
+            headers=headers,
+        ),
+    }
+
+
+def main(argv=None):
+    parser = build_parser('Benchmark the catalog API endpoints.')
+    parser.add_argument('--authors', type=int, default=200)
+    parser.add_argument('--books-per-author', type=int, default=10)
+    parser.add_argument(
+        '--only', nargs='*', help='run only the named scenarios'
+    )
+    parser.add_argument(
+        '--response-cache',
+        action='store_true',
+        help='serve reads through the response cache (default: uncached)',
+    )
+    args = parser.parse_args(argv)
+
+    with benchmark_engine(args.database_url) as engine:
+        author_ids, years = seed_catalog(
+            engine, args.authors, args.books_per_author, args.seed
+        )
+        results = new_results(
+            'catalog',
+            engine,
+            authors=args.authors,
+            books_per_author=args.books_per_author,
+            requests=args.requests,
+            seed=args.seed,
+            response_cache=args.response_cache,
+        )
+        with benchmark_client(engine, args.response_cache) as client:
+            requests = catalog_requests(client, author_ids, years, args.seed)
+            for name, send in requests.items():
+                if args.only and name not in args.only:
+                    continue
+                results['scenarios'][name] = measure(
+                    send, args.requests, args.warmup
+                )
+
+    return finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
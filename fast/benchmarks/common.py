@@ -0,0 +1,203 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+from fast.app import app
+from fast.caching import response_cache
+from fast.database import get_read_session, get_session
+from fast.models import table_registry
+from fast.security import token_cache
+
+
+def build_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--database-url',
+        help='database to benchmark against (default: temporary SQLite file)',
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=Path, help='write results as JSON')
+    parser.add_argument(
+        '--baseline', type=Path, help='results JSON to compare against'
+    )
+    parser.add_argument(
+        '--max-regression',
+        type=float,
+        default=0.1,
+        help='allowed relative drop in throughput or rise in p99',
+    )
+    return parser
+
+
+def populated_tables(engine):
+    tables = inspect(engine).get_table_names()
+    with engine.connect() as connection:
+        return [
+            table.name
+            for table in table_registry.metadata.sorted_tables
+            if table.name in tables
+            and connection.scalar(select(1).select_from(table).limit(1))
+        ]
+
+
+@contextmanager
+def benchmark_engine(database_url=None):
+    with TemporaryDirectory() as directory:
+        engine = create_engine(
+            database_url or f'sqlite:///{directory}/benchmark.db'
+        )
+        # The suite drops and recreates every table, so only run it
+        # against a database that holds no data.
+        if populated := populated_tables(engine):
+            engine.dispose()
+            raise SystemExit(
+                f'refusing to benchmark against {engine.url!r}: '
+                f'{", ".join(populated)} already contain rows'
+            )
+        table_registry.metadata.drop_all(engine)
+        table_registry.metadata.create_all(engine)
+        try:
+            yield engine
+        finally:
+            table_registry.metadata.drop_all(engine)
+            engine.dispose()
+
+
+class NullCache:
+    def get(self, key):  # noqa: PLR6301
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def clear(self):
+        pass
+
+
+@contextmanager
+def benchmark_client(engine, response_caching=False):
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    # Reads are measured uncached unless asked otherwise, so runs stay
+    # comparable with each other and with runs from before the cache.
+    backend = response_cache.backend
+    if not response_caching:
+        response_cache.backend = NullCache()
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        response_cache.backend = backend
+        token_cache.clear()
+        response_cache.clear()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'throughput': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def time_calls(call, iterations, warmup=0):
+    for index in range(warmup):
+        call(index)
+
+    latencies = []
+    started = time.perf_counter()
+    for index in range(warmup, warmup + iterations):
+        start = time.perf_counter()
+        call(index)
+        latencies.append(time.perf_counter() - start)
+
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def measure(send, requests, warmup=0):
+    def call(index):
+        send(index).raise_for_status()
+
+    return time_calls(call, requests, warmup)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_results(suite, engine=None, **parameters):
+    return {
+        'suite': suite,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'database': engine.dialect.name if engine is not None else None,
+        'parameters': parameters,
+        'scenarios': {},
+    }
+
+
+def find_regressions(results, baseline, max_regression):
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        if current['throughput'] < previous['throughput'] * (
+            1 - max_regression
+        ):
+            regressions.append(
+                f'{name}: throughput {previous["throughput"]} -> '
+                f'{current["throughput"]} req/s'
+            )
+        if current['p99_ms'] > previous['p99_ms'] * (1 + max_regression):
+            regressions.append(
+                f'{name}: p99 {previous["p99_ms"]} -> {current["p99_ms"]} ms'
+            )
+    return regressions
+
+
+def finish(results, args):
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report + '\n')
+
+    if args.baseline is None:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = find_regressions(results, baseline, args.max_regression)
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,92 @@
+import random
+import sys
+
+from benchmarks.common import build_parser, finish, new_results, time_calls
+from fast.utils.sanitize import cached_normalize, normalize, sanitize
+
+UNICODE_WORDS = (
+    'fundação',
+    'Über',
+    'naïve',
+    'Ωμέγα',
+    'Война',
+    '東京',
+    'café',
+    'ﬁnal',
+    'İstanbul',
+)
+ASCII_WORDS = ('the', 'Road', 'to', 'Wigan', 'Pier', "Orwell's", '1984')
+PUNCTUATION = ('', '', '!', ',', '...', ' -', '_', ':', '?')
+
+
+def legacy_sanitize(string):
+    alpha = ''.join(
+        char for char in string if char.isalnum() or char.isspace()
+    )
+    return ' '.join(alpha.split()).lower()
+
+
+def make_titles(words, count, length, seed):
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        parts = []
+        while sum(map(len, parts)) < length:
+            parts.append(rng.choice(words) + rng.choice(PUNCTUATION))
+        titles.append('  '.join(parts))
+    return titles
+
+
+def sanitize_calls(titles):
+    def each(function):
+        return lambda index: [function(title) for title in titles]
+
+    def cached(index):
+        cached_normalize.cache_clear()
+        for _ in range(3):
+            for title in titles:
+                sanitize(title)
+
+    def legacy_repeated(index):
+        for _ in range(3):
+            for title in titles:
+                legacy_sanitize(title)
+
+    return {
+        'legacy': each(legacy_sanitize),
+        'uncached': each(normalize),
+        'legacy_3x': legacy_repeated,
+        'cached_3x': cached,
+    }
+
+
+def main(argv=None):
+    parser = build_parser(
+        'Benchmark sanitize() on long titles, per batch of titles.'
+    )
+    parser.add_argument('--titles', type=int, default=100)
+    parser.add_argument('--length', type=int, default=150)
+    args = parser.parse_args(argv)
+
+    results = new_results(
+        'sanitize',
+        titles=args.titles,
+        length=args.length,
+        iterations=args.requests,
+        seed=args.seed,
+    )
+    for charset, words in (
+        ('unicode', UNICODE_WORDS),
+        ('ascii', ASCII_WORDS),
+    ):
+        titles = make_titles(words, args.titles, args.length, args.seed)
+        for name, call in sanitize_calls(titles).items():
+            results['scenarios'][f'{charset}_{name}'] = time_calls(
+                call, args.requests, args.warmup
+            )
+
+    return finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import sys
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks.catalog import seed_catalog
+from benchmarks.common import (
+    benchmark_engine,
+    build_parser,
+    finish,
+    new_results,
+    time_calls,
+)
+from fast.database import BOOK_COLUMNS
+from fast.models import Book
+from fast.schemas import BookList
+from fast.utils.serialize import dumps, page_payload
+
+
+def serialization_calls(session, rows):
+    entities = session.scalars(select(Book).order_by(Book.id)).all()
+    tuples = session.execute(select(*BOOK_COLUMNS).order_by(Book.id)).all()
+
+    def orm_pydantic(index):
+        session.expunge_all()
+        books = session.scalars(
+            select(Book).order_by(Book.id).limit(rows)
+        ).all()
+        BookList.model_validate(
+            {'books': books}, from_attributes=True
+        ).model_dump_json(exclude_none=True)
+
+    def tuples_fast_json(index):
+        books = session.execute(
+            select(*BOOK_COLUMNS).order_by(Book.id).limit(rows)
+        ).all()
+        dumps(page_payload('books', books))
+
+    return {
+        'orm_pydantic': orm_pydantic,
+        'tuples_fast_json': tuples_fast_json,
+        'serialize_only_pydantic': lambda index: BookList.model_validate(
+            {'books': entities}, from_attributes=True
+        ).model_dump_json(exclude_none=True),
+        'serialize_only_fast_json': lambda index: dumps(
+            page_payload('books', tuples)
+        ),
+    }
+
+
+def main(argv=None):
+    parser = build_parser(
+        'Benchmark list serialization cost per batch of rows.'
+    )
+    parser.add_argument('--rows', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    authors = max(1, args.rows // 10)
+    with benchmark_engine(args.database_url) as engine:
+        seed_catalog(engine, authors, 10, args.seed)
+        results = new_results(
+            'serialization',
+            engine,
+            rows=args.rows,
+            iterations=args.requests,
+            seed=args.seed,
+        )
+        with Session(engine) as session:
+            calls = serialization_calls(session, args.rows)
+            for name, call in calls.items():
+                results['scenarios'][name] = time_calls(
+                    call, args.requests, args.warmup
+                )
+
+    return finish(results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
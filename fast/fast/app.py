@@ -1,11 +1,83 @@
+import time
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from fast.database import async_engine, engine, prewarm_pool, settings
+from fast.instrumentation import (
+    QueryStats,
+    current_query_stats,
+    record_request,
+    server_timing,
+)
+from fast.metrics import (
+    CONTENT_TYPE,
+    pool_timeouts,
+    registry,
+    request_latency,
+    requests_in_flight,
+)
 from fast.routers import auth, authors, books, users
 from fast.schemas import Message
+from fast.security import hash_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.THREADPOOL_SIZE:
+        limiter = to_thread.current_default_thread_limiter()
+        limiter.total_tokens = settings.THREADPOOL_SIZE
+    hash_pool.start()
+    if settings.DB_POOL_PREWARM:
+        await to_thread.run_sync(
+            prewarm_pool, engine, settings.DB_POOL_PREWARM
+        )
+
+    yield
+
+    hash_pool.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    pool_timeouts.inc()
+    return JSONResponse(
+        {'detail': 'Server busy, try again later'},
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(settings.DB_POOL_RETRY_AFTER)},
+    )
+
+
+@app.middleware('http')
+async def query_instrumentation(request: Request, call_next):
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    requests_in_flight.inc()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+        requests_in_flight.dec()
+    handler_time = time.perf_counter() - start
+
+    route = request.scope.get('route')
+    path = route.path if route else 'unmatched'
+    record_request(path, stats, handler_time)
+    request_latency.observe(handler_time, (request.method, path))
+    response.headers['Server-Timing'] = server_timing(stats, handler_time)
+
+    return response
 
-app = FastAPI()
 
 app.include_router(users.router)
 app.include_router(auth.router)
@@ -13,6 +85,11 @@ app.include_router(authors.router)
 app.include_router(books.router)
 
 
+@app.get('/metrics', include_in_schema=False)
+def read_metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
 def read_root():
     return {'message': 'Hello world'}
@@ -0,0 +1,140 @@
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+from secrets import token_hex
+from typing import NamedTuple, Protocol
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from fast.database import run_read
+from fast.metrics import Counter, registry
+from fast.settings import Settings
+from fast.utils.cache import TTLCache
+from fast.utils.conditional import content_etag, http_date, is_not_modified
+from fast.utils.serialize import dumps
+
+settings = Settings()
+
+cache_requests = registry.register(
+    Counter(
+        'response_cache_requests_total',
+        'Response cache lookups by namespace and result.',
+        ('namespace', 'result'),
+    )
+)
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: datetime | None = None
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str): ...
+
+    def set(self, key: str, value, ttl: float | None = None): ...
+
+    def clear(self): ...
+
+
+def normalize_params(params: dict):
+    return urlencode(
+        sorted(
+            (key, value) for key, value in params.items() if value is not None
+        )
+    )
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def generation(self, scope: str):
+        key = f'generation:{scope}'
+        token = self.backend.get(key)
+        if token is None:
+            token = token_hex(8)
+            self.backend.set(key, token)
+        return token
+
+    def invalidate(self, *scopes: str):
+        for scope in scopes:
+            self.backend.set(f'generation:{scope}', token_hex(8))
+
+    def fetch(self, scope: str, params: dict, render, depends_on=()):
+        namespace = scope.split(':', 1)[0]
+        generations = ':'.join(
+            self.generation(name) for name in (scope, *depends_on)
+        )
+        key = f'{scope}:{generations}?{normalize_params(params)}'
+
+        body = self.backend.get(key)
+        if body is not None:
+            cache_requests.inc((namespace, 'hit'))
+            return body
+
+        cache_requests.inc((namespace, 'miss'))
+        body = render()
+        self.backend.set(key, body)
+        return body
+
+    def clear(self):
+        self.backend.clear()
+
+
+response_cache = ResponseCache(
+    TTLCache(
+        maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL
+    )
+)
+
+
+def page_body(page: dict):
+    body = dumps(page)
+    return CachedBody(body, content_etag(body, weak=True))
+
+
+def cached_response(
+    request: Request, scope: str, params: dict, render, depends_on=()
+):
+    cached = response_cache.fetch(scope, params, render, depends_on)
+
+    headers = {'ETag': cached.etag, 'Cache-Control': 'no-cache'}
+    if cached.last_modified is not None:
+        headers['Last-Modified'] = http_date(cached.last_modified)
+
+    if is_not_modified(request.headers, cached.etag, cached.last_modified):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    return Response(
+        cached.body, media_type='application/json', headers=headers
+    )
+
+
+async def cached_read(  # noqa: PLR0913, PLR0917
+    request: Request, session, scope: str, params: dict, render, depends_on=()
+):
+    def respond(session):
+        return cached_response(
+            request, scope, params, partial(render, session), depends_on
+        )
+
+    return await run_read(session, respond)
+
+
+def invalidate_books(*book_ids: int):
+    response_cache.invalidate(
+        'books:list', *(f'books:{book_id}' for book_id in book_ids)
+    )
+
+
+def invalidate_all_books():
+    response_cache.invalidate('books:list', 'books:items')
+
+
+def invalidate_authors(*author_ids: int):
+    response_cache.invalidate(
+        'authors:list', *(f'authors:{author_id}' for author_id in author_ids)
+    )
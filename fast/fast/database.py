@@ -1,97 +1,308 @@
 from http import HTTPStatus
+from itertools import islice
 
 from fastapi import HTTPException
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import (
+    create_engine,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, aliased
 
+from fast.instrumentation import instrument_engine
+from fast.metrics import register_pool_metrics
 from fast.models import Author, Book, User
+from fast.schemas import AuthorPublic, BookPublic, UserPublic
 from fast.settings import Settings
 from fast.utils.sanitize import sanitize
+from fast.utils.serialize import row_dicts
 
-engine = create_engine(Settings().DATABASE_URL)
+settings = Settings()
+
+
+def engine_options(settings):
+    options = {
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+    }
+    options = {
+        key: value for key, value in options.items() if value is not None
+    }
+    options['pool_pre_ping'] = settings.DB_POOL_PRE_PING
+    return options
+
+
+def prewarm_pool(engine, connections):
+    size = getattr(engine.pool, 'size', None)
+    if size is not None:
+        connections = min(connections, size())
+
+    opened = [engine.connect() for _ in range(connections)]
+    for connection in opened:
+        connection.close()
+    return len(opened)
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings))
+instrument_engine(engine)
+register_pool_metrics(engine)
+
+async_engine = (
+    create_async_engine(settings.ASYNC_DATABASE_URL)
+    if settings.ASYNC_DATABASE_URL
+    else None
+)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+
+
+BULK_CHUNK_SIZE = 500
+NESTED_BOOKS_LIMIT = 10
+
+
+def public_columns(model, schema):
+    return tuple(getattr(model, field) for field in schema.model_fields)
+
+
+BOOK_COLUMNS = public_columns(Book, BookPublic)
+AUTHOR_COLUMNS = public_columns(Author, AuthorPublic)
+USER_COLUMNS = public_columns(User, UserPublic)
 
 
 def get_session():  # pragma: no cover
-    with Session(engine) as session:
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
 
-def check_existing_users(session, user):
-    db_user = session.scalar(
-        select(User).where(
-            (User.username == sanitize(user.username))
-            | (User.email == user.email)
-        )
+async def get_async_session():  # pragma: no cover
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_read_session():  # pragma: no cover
+    if async_engine is not None:
+        async for session in get_async_session():
+            yield session
+        return
+
+    session = Session(engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await run_in_threadpool(session.close)
+
+
+async def run_read(session, fn, *args):
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args)
+    return await run_in_threadpool(fn, session, *args)
+
+
+def existing_users_query(user):
+    return select(User).where(
+        (User.username == sanitize(user.username)) | (User.email == user.email)
     )
-    if db_user:
-        if db_user.username == sanitize(user.username):
-            raise HTTPException(
-                status_code=HTTPStatus.CONFLICT,
-                detail='Username already exists',
-            )
-        elif db_user.email == user.email:
-            raise HTTPException(
-                status_code=HTTPStatus.CONFLICT,
-                detail='Email already exists',
-            )
 
 
-def check_existing_users_patch(session, user):
+def existing_users_patch_query(user):
+    conditions = []
     if user.username:
-        db_user = session.scalar(
-            select(User).where((User.username == sanitize(user.username)))
-        )
-        if db_user:
-            if db_user.username == sanitize(user.username):
-                raise HTTPException(
-                    status_code=HTTPStatus.CONFLICT,
-                    detail='Username already exists',
-                )
+        conditions.append(User.username == sanitize(user.username))
     if user.email:
-        db_user = session.scalar(
-            select(User).where((User.email == user.email))
+        conditions.append(User.email == user.email)
+    return select(User).where(or_(*conditions)) if conditions else None
+
+
+def raise_existing_user(db_users, user):
+    username = user.username and sanitize(user.username)
+    if username and any(u.username == username for u in db_users):
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Username already exists',
         )
-        if db_user:
-            if db_user.email == user.email:
-                raise HTTPException(
-                    status_code=HTTPStatus.CONFLICT,
-                    detail='Email already exists',
-                )
+    if user.email and any(u.email == user.email for u in db_users):
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Email already exists',
+        )
+
+
+USER_CONFLICTS = {
+    # PostgreSQL constraint names, then SQLite "table.column" targets.
+    'users_username_key': 'Username already exists',
+    'users_email_key': 'Email already exists',
+    'users.username': 'Username already exists',
+    'users.email': 'Email already exists',
+}
+
+
+def integrity_error_target(exc):
+    constraint = getattr(
+        getattr(exc.orig, 'diag', None), 'constraint_name', None
+    )
+    if constraint:
+        return constraint
+    # SQLite: "UNIQUE constraint failed: users.email"
+    return str(exc.orig).rpartition(': ')[2]
+
+
+def raise_user_integrity_error(exc):
+    detail = USER_CONFLICTS.get(integrity_error_target(exc))
+    if detail is None:
+        raise exc
+    raise HTTPException(status_code=HTTPStatus.CONFLICT, detail=detail)
+
+
+def author_patch_query(author_id, author):
+    other = aliased(Author)
+    duplicate = exists().where(other.name == sanitize(author.name or ''))
+    return select(Author, duplicate).where(Author.id == author_id)
 
 
-def check_existing_authors(session, author):
-    db_author = session.scalar(
-        select(Author).where((Author.name == sanitize(author.name)))
+def book_patch_query(book_id, book):
+    other = aliased(Book)
+    duplicate = exists().where(
+        (other.title == sanitize(book.title or ''))
+        & (other.author_id == book.author_id)
     )
-    if db_author:
-        # if db_author.name == sanitize(author.name):
+    author = exists().where(Author.id == book.author_id)
+    return select(Book, duplicate, author).where(Book.id == book_id)
+
+
+def raise_existing_author(duplicate):
+    if duplicate:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Author already exists',
         )
 
 
-def check_existing_books_from_author(session, book):
-    db_book = session.scalar(
-        select(Book).where(
-            (Book.title == sanitize(book.title))
-            & (Book.author_id == (book.author_id))
-        )
-    )
-    if db_book:
-        # if db_book.title == sanitize(book.title):
+def raise_existing_book_from_author(duplicate):
+    if duplicate:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Book from this author already exists',
         )
 
 
-def check_existing_author_by_id(session, book):
-    db_author = session.scalar(
-        select(Author).where((Author.id == book.author_id))
-    )
-    if not db_author:
+def raise_missing_author(author_exists):
+    if not author_exists:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Author does not exist in the database',
         )
+
+
+def check_existing_users(session, user):
+    raise_existing_user(
+        session.scalars(existing_users_query(user)).all(), user
+    )
+
+
+def check_existing_users_patch(session, user):
+    query = existing_users_patch_query(user)
+    if query is not None:
+        raise_existing_user(session.scalars(query).all(), user)
+
+
+def chunked(items, size=BULK_CHUNK_SIZE):
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def insert_rows(session, statement, rows):
+    def execute(batch):
+        result = session.execute(statement, batch)
+        return result.all() if statement.exported_columns else batch
+
+    try:
+        return execute(rows), []
+    except IntegrityError:
+        session.rollback()
+
+    # A concurrent writer inserted some of these rows after they were
+    # checked; retry one row per savepoint and report the losers.
+    created = []
+    conflicts = []
+    for index, row in enumerate(rows):
+        try:
+            with session.begin_nested():
+                created.extend(execute([row]))
+        except IntegrityError:
+            conflicts.append(index)
+    return created, conflicts
+
+
+def existing_author_names(session, names):
+    found = set()
+    for chunk in chunked(names):
+        found.update(
+            session.scalars(select(Author.name).where(Author.name.in_(chunk)))
+        )
+    return found
+
+
+def existing_author_ids(session, author_ids):
+    found = set()
+    for chunk in chunked(author_ids):
+        found.update(
+            session.scalars(select(Author.id).where(Author.id.in_(chunk)))
+        )
+    return found
+
+
+def existing_books_from_authors(session, keys):
+    found = set()
+    for chunk in chunked(keys):
+        found.update(
+            tuple(row)
+            for row in session.execute(
+                select(Book.title, Book.author_id).where(
+                    Book.author_id.in_({author_id for _, author_id in chunk}),
+                    Book.title.in_({title for title, _ in chunk}),
+                    tuple_(Book.title, Book.author_id).in_(chunk),
+                )
+            )
+        )
+    return found
+
+
+def books_by_author(session, author_ids, limit):
+    position = (
+        func
+        .row_number()
+        .over(partition_by=Book.author_id, order_by=Book.id)
+        .label('position')
+    )
+    books = {}
+    for chunk in chunked(author_ids):
+        ranked = (
+            select(*BOOK_COLUMNS, position)
+            .where(Book.author_id.in_(chunk))
+            .subquery()
+        )
+        rows = session.execute(
+            select(*(ranked.c[column.key] for column in BOOK_COLUMNS))
+            .where(ranked.c.position <= limit + 1)
+            .order_by(ranked.c.author_id, ranked.c.position)
+        ).all()
+        for book in row_dicts(rows):
+            books.setdefault(book['author_id'], []).append(book)
+    return books
+
+
+def delete_author_cascade(session, author_id):
+    session.execute(delete(Book).where(Book.author_id == author_id))
+    return session.execute(
+        delete(Author).where(Author.id == author_id)
+    ).rowcount
@@ -0,0 +1,179 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from fast.database import (
+    chunked,
+    engine,
+    existing_author_ids,
+    existing_books_from_authors,
+    insert_rows,
+)
+from fast.models import Author, Book
+from fast.utils.sanitize import sanitize
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class InvalidImportFile(ValueError):
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+def read_records(lines, import_format):
+    if import_format == 'csv':
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else {}
+
+
+def parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_authors(session, batch):
+    names = {
+        sanitize(str(record['author']))
+        for record in batch
+        if record.get('author') and not record.get('author_id')
+    }
+    ids = {parse_int(record.get('author_id')) for record in batch} - {None}
+
+    by_name = {}
+    for chunk in chunked(names):
+        by_name.update(
+            session.execute(
+                select(Author.name, Author.id).where(Author.name.in_(chunk))
+            ).all()
+        )
+
+    return by_name, existing_author_ids(session, ids)
+
+
+def prepare_batch(session, batch):
+    authors_by_name, author_ids = resolve_authors(session, batch)
+
+    candidates = []
+    for record in batch:
+        title = sanitize(str(record.get('title') or ''))
+        year = parse_int(record.get('year'))
+        author_id = parse_int(record.get('author_id'))
+        if author_id is None and record.get('author'):
+            author_id = authors_by_name.get(sanitize(str(record['author'])))
+        elif author_id not in author_ids:
+            author_id = None
+
+        if title and year and author_id:
+            candidates.append({
+                'year': year,
+                'title': title,
+                'author_id': author_id,
+            })
+
+    existing = existing_books_from_authors(
+        session, {(row['title'], row['author_id']) for row in candidates}
+    )
+    rows = []
+    for row in candidates:
+        key = (row['title'], row['author_id'])
+        if key not in existing:
+            existing.add(key)
+            rows.append(row)
+
+    return rows
+
+
+def import_batch(session, batch):
+    rows = prepare_batch(session, batch)
+    if rows:
+        rows, _ = insert_rows(session, insert(Book), rows)
+        session.commit()
+    return len(rows)
+
+
+def import_summary(imported, skipped, start):
+    seconds = time.perf_counter() - start
+    return {
+        'imported': imported,
+        'skipped': skipped,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(imported / seconds, 1) if seconds else 0.0,
+    }
+
+
+def import_books(session, records, batch_size=IMPORT_BATCH_SIZE):
+    imported = 0
+    skipped = 0
+    start = time.perf_counter()
+
+    try:
+        for batch in chunked(records, batch_size):
+            inserted = import_batch(session, batch)
+            imported += inserted
+            skipped += len(batch) - inserted
+    except (UnicodeDecodeError, csv.Error) as exc:
+        # Earlier batches are already committed; report how far we got.
+        raise InvalidImportFile(
+            f'Invalid import file: {exc}',
+            import_summary(imported, skipped, start),
+        ) from exc
+
+    return import_summary(imported, skipped, start)
+
+
+def import_books_file(session, binary_file, import_format, batch_size):
+    lines = io.TextIOWrapper(binary_file, encoding='utf-8', newline='')
+    try:
+        return import_books(
+            session, read_records(lines, import_format), batch_size
+        )
+    finally:
+        lines.detach()
+
+
+def main(argv=None):  # pragma: no cover
+    parser = argparse.ArgumentParser(
+        description='Import books from an NDJSON or CSV file.'
+    )
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['ndjson', 'csv'])
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    import_format = args.format or (
+        'csv' if args.path.endswith('.csv') else 'ndjson'
+    )
+    with open(args.path, 'rb') as binary_file, Session(engine) as session:
+        try:
+            result = import_books_file(
+                session, binary_file, import_format, args.batch_size
+            )
+        except InvalidImportFile as exc:
+            json.dump(exc.result, sys.stdout)
+            sys.stdout.write('\n')
+            sys.exit(str(exc))
+
+    json.dump(result, sys.stdout)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,75 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from threading import Lock
+
+from sqlalchemy import event
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class RouteStats:
+    requests: int = 0
+    queries: int = 0
+    db_time: float = 0.0
+    handler_time: float = 0.0
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    'current_query_stats', default=None
+)
+
+route_stats: defaultdict[str, RouteStats] = defaultdict(RouteStats)
+route_stats_lock = Lock()
+
+TRANSACTION_CONTROL = ('BEGIN', 'SAVEPOINT', 'RELEASE', 'ROLLBACK TO')
+
+
+def before_cursor_execute(conn, cursor, statement, *args):
+    if statement.startswith(TRANSACTION_CONTROL):
+        return
+    if current_query_stats.get() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, *args):
+    if statement.startswith(TRANSACTION_CONTROL):
+        return
+    stats = current_query_stats.get()
+    starts = conn.info.get('query_start')
+    if stats is not None and starts:
+        stats.count += 1
+        stats.duration += time.perf_counter() - starts.pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def record_request(route, stats, handler_time):
+    with route_stats_lock:
+        totals = route_stats[route]
+        totals.requests += 1
+        totals.queries += stats.count
+        totals.db_time += stats.duration
+        totals.handler_time += handler_time
+
+
+def route_stats_snapshot():
+    # /metrics scrapes run in the threadpool while requests add routes.
+    with route_stats_lock:
+        return {route: replace(stats) for route, stats in route_stats.items()}
+
+
+def server_timing(stats, handler_time):
+    return (
+        f'db;dur={stats.duration * 1000:.3f};desc="{stats.count} queries", '
+        f'app;dur={handler_time * 1000:.3f}'
+    )
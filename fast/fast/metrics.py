@@ -0,0 +1,266 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from fast.instrumentation import route_stats_snapshot
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+CHECKOUT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace('\\', r'\\')
+        .replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.values = {}
+        self.lock = Lock()
+
+    def header(self):
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+
+    def samples(self):
+        if self.callback is not None:
+            return self.callback()
+        with self.lock:
+            return dict(self.values)
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.samples().items():
+            lines.append(
+                f'{self.name}{format_labels(self.labelnames, labels)} '
+                f'{format_value(value)}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, value, labels=()):
+        with self.lock:
+            self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets or LATENCY_BUCKETS)
+
+    def observe(self, value, labels=()):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, labels=()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def render(self):
+        with self.lock:
+            series = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self.values.items()
+            ]
+
+        lines = self.header()
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = format_labels(
+                    self.labelnames, labels, f'le="{format_value(bound)}"'
+                )
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            suffix = format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{suffix} {format_value(total)}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        return ''.join(metric.render() for metric in self.metrics)
+
+
+registry = Registry()
+
+request_latency = registry.register(
+    Histogram(
+        'http_request_duration_seconds',
+        'Time spent handling HTTP requests.',
+        ('method', 'route'),
+    )
+)
+requests_in_flight = registry.register(
+    Gauge('http_requests_in_flight', 'HTTP requests currently in progress.')
+)
+password_hash_duration = registry.register(
+    Histogram(
+        'password_hash_duration_seconds',
+        'Time spent hashing or verifying passwords with Argon2.',
+        ('operation',),
+        HASH_BUCKETS,
+    )
+)
+pool_timeouts = registry.register(
+    Counter(
+        'db_pool_timeouts_total',
+        'Requests rejected because no pooled connection became available.',
+    )
+)
+pool_checkout_wait = registry.register(
+    Histogram(
+        'db_pool_checkout_wait_seconds',
+        'Time a session waited for a pooled connection.',
+        buckets=CHECKOUT_BUCKETS,
+    )
+)
+registry.register(
+    Counter(
+        'http_route_queries_total',
+        'SQL statements executed while handling requests.',
+        ('route',),
+        lambda: {
+            (route,): s.queries for route, s in route_stats_snapshot().items()
+        },
+    )
+)
+registry.register(
+    Counter(
+        'http_route_db_seconds_total',
+        'Time spent in SQL statements while handling requests.',
+        ('route',),
+        lambda: {
+            (route,): s.db_time for route, s in route_stats_snapshot().items()
+        },
+    )
+)
+
+
+def pool_stat(engine, method):
+    def collect():
+        stat = getattr(engine.pool, method, None)
+        return {(): stat()} if stat is not None else {}
+
+    return collect
+
+
+def register_pool_metrics(engine):
+    for method, documentation in (
+        ('size', 'Configured size of the connection pool.'),
+        ('checkedout', 'Connections currently checked out of the pool.'),
+        ('overflow', 'Connections opened beyond the pool size.'),
+    ):
+        registry.register(
+            Gauge(
+                f'db_pool_{method}',
+                documentation,
+                callback=pool_stat(engine, method),
+            )
+        )
+
+
+@event.listens_for(Session, 'after_transaction_create')
+def start_checkout_timer(session, transaction):
+    if transaction.parent is None:
+        session.info['checkout_started'] = time.perf_counter()
+
+
+@event.listens_for(Session, 'after_begin')
+def observe_checkout_wait(session, transaction, connection):
+    started = session.info.pop('checkout_started', None)
+    if started is not None:
+        pool_checkout_wait.observe(time.perf_counter() - started)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 table_registry = registry()
@@ -9,6 +9,7 @@ table_registry = registry()
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -25,9 +26,10 @@ class User:
 @table_registry.mapped_as_dataclass
 class Author:
     __tablename__ = 'authors'
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    name: Mapped[str]
+    name: Mapped[str] = mapped_column(unique=True, index=True)
     books: Mapped[list['Book']] = relationship(
         init=False, back_populates='author', cascade='all, delete-orphan'
     )
@@ -42,6 +44,12 @@ class Author:
 @table_registry.mapped_as_dataclass
 class Book:
     __tablename__ = 'books'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_books_author_id_title', 'author_id', 'title', unique=True),
+        Index('ix_books_author_id_id', 'author_id', 'id'),
+        Index('ix_books_year_id', 'year', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     year: Mapped[int]
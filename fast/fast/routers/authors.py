@@ -1,24 +1,54 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from fast.database import check_existing_authors, get_session
+from fast.caching import (
+    CachedBody,
+    cached_read,
+    invalidate_all_books,
+    invalidate_authors,
+    page_body,
+)
+from fast.database import (
+    AUTHOR_COLUMNS,
+    NESTED_BOOKS_LIMIT,
+    author_patch_query,
+    books_by_author,
+    delete_author_cascade,
+    existing_author_names,
+    get_read_session,
+    get_session,
+    insert_rows,
+    raise_existing_author,
+)
 from fast.models import Author, User
+from fast.routers.books import find_books
 from fast.schemas import (
+    AuthorBulkResult,
     AuthorList,
     AuthorPublic,
     AuthorSchema,
     AuthorUpdate,
+    BookList,
     Message,
 )
+from fast.search import trigram_contains
 from fast.security import get_current_user
+from fast.utils.conditional import content_etag
+from fast.utils.cursor import decode_cursor, encode_cursor
+from fast.utils.export import stream_export
 from fast.utils.sanitize import sanitize
+from fast.utils.serialize import dumps, page_payload
 
 router = APIRouter()
 
+ReadSession = Annotated[AsyncSession | Session, Depends(get_read_session)]
 Session = Annotated[Session, Depends(get_session)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
@@ -31,48 +61,221 @@ def create_author(
     user: CurrentUser,
     session: Session,
 ):
-    check_existing_authors(session, author)
-
-    if not sanitize(author.name):
+    name = sanitize(author.name)
+    if not name:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Empty string',
         )
 
-    db_author = Author(name=sanitize(author.name))
-    session.add(db_author)
-    session.commit()
-    session.refresh(db_author)
+    try:
+        db_author = session.execute(
+            insert(Author).values(name=name).returning(Author.id, Author.name)
+        ).one()
+        session.commit()
+        invalidate_authors()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Author already exists',
+        )
 
     return db_author
 
 
-@router.get('/', response_model=AuthorList)
-def list_authors(  # noqa
+@router.post('/bulk', response_model=AuthorBulkResult)
+def create_authors_bulk(
+    authors: list[AuthorSchema],
+    user: CurrentUser,
     session: Session,
+):
+    names = [sanitize(author.name) for author in authors]
+    existing = existing_author_names(session, set(names))
+
+    rows = []
+    row_indexes = []
+    conflicts = []
+    for index, name in enumerate(names):
+        if not name:
+            conflicts.append({'index': index, 'detail': 'Empty string'})
+        elif name in existing:
+            conflicts.append({
+                'index': index,
+                'detail': 'Author already exists',
+            })
+        else:
+            existing.add(name)
+            row_indexes.append(index)
+            rows.append({'name': name})
+
+    created = []
+    if rows:
+        created, lost = insert_rows(
+            session,
+            insert(Author).returning(
+                Author.id, Author.name, sort_by_parameter_order=True
+            ),
+            rows,
+        )
+        session.commit()
+        invalidate_authors()
+        conflicts.extend(
+            {
+                'index': row_indexes[lost_index],
+                'detail': 'Author already exists',
+            }
+            for lost_index in lost
+        )
+        conflicts.sort(key=lambda conflict: conflict['index'])
+
+    return {'authors': created, 'conflicts': conflicts}
+
+
+def find_authors(session, name, offset, limit, cursor):
+    query = select(*AUTHOR_COLUMNS)
+
+    if cursor:
+        filters = decode_cursor(cursor)
+        if not filters:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+            )
+        name = filters.get('name')
+        query = query.where(Author.id > filters['id'])
+    else:
+        query = query.offset(offset)
+
+    conditions = []
+    if name:
+        name = sanitize(name)
+        conditions.append(trigram_contains(Author.name, name))
+
+    authors = session.execute(
+        query.where(*conditions).order_by(Author.id).limit(limit)
+    ).all()
+
+    next_cursor = None
+    if limit and len(authors) == limit:
+        next_cursor = encode_cursor(authors[-1].id, name=name)
+
+    return page_payload('authors', authors, next_cursor)
+
+
+def attach_books(session, authors, limit):
+    books = books_by_author(
+        session, [author['id'] for author in authors], limit
+    )
+    for author in authors:
+        author_books = books.get(author['id'], [])
+        author['books'] = author_books[:limit]
+        if len(author_books) > limit:
+            author['books_next_cursor'] = encode_cursor(
+                author_books[limit - 1]['id']
+            )
+
+
+@router.get('/', response_model=AuthorList, response_model_exclude_none=True)
+async def list_authors(  # noqa
+    request: Request,
+    session: ReadSession,
     name: str = Query(None),
     offset: int = Query(None),
     limit: int = Query(None),
+    cursor: str = Query(None),
+    include: Literal['books'] = Query(None),
+    books_limit: int = Query(NESTED_BOOKS_LIMIT, gt=0, le=100),
 ):
-    query = select(Author)
+    params = {'name': name, 'offset': offset, 'limit': limit, 'cursor': cursor}
 
-    if name:
-        query = query.filter(Author.name.contains(sanitize(name)))
+    def render(session):
+        page = find_authors(session, **params)
+        if include == 'books':
+            attach_books(session, page['authors'], books_limit)
+        return page_body(page)
 
-    authors = session.scalars(query.offset(offset).limit(limit)).all()
+    depends_on = ('books:list',) if include == 'books' else ()
+    return await cached_read(
+        request,
+        session,
+        'authors:list',
+        {**params, 'include': include, 'books_limit': books_limit},
+        render,
+        depends_on,
+    )
 
-    return {'authors': authors}
 
+@router.get('/export', response_class=StreamingResponse)
+def export_authors(
+    session: Session,
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+):
+    query = select(Author.id, Author.name).order_by(Author.id)
 
-@router.get('/{author_id}', response_model=AuthorPublic)
-def read_author(author_id: int, session: Session):
-    db_author = session.scalar(select(Author).where(Author.id == author_id))
-    if not db_author:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Author not found'
+    return stream_export(session, query, format, 'authors')
+
+
+@router.get(
+    '/{author_id}/books',
+    response_model=BookList,
+    response_model_exclude_none=True,
+)
+async def list_author_books(  # noqa
+    author_id: int,
+    request: Request,
+    session: ReadSession,
+    offset: int = Query(None),
+    limit: int = Query(NESTED_BOOKS_LIMIT, gt=0, le=100),
+    cursor: str = Query(None),
+):
+    params = {'offset': offset, 'limit': limit, 'cursor': cursor}
+
+    def render(session):
+        if not session.scalar(select(Author.id).where(Author.id == author_id)):
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail='Author not found'
+            )
+
+        return page_body(
+            find_books(
+                session,
+                title=None,
+                year=None,
+                author_id=author_id,
+                **params,
+            )
         )
 
-    return db_author
+    return await cached_read(
+        request,
+        session,
+        'books:list',
+        {**params, 'author_id': author_id},
+        render,
+    )
+
+
+@router.get('/{author_id}', response_model=AuthorPublic)
+async def read_author(author_id: int, request: Request, session: ReadSession):
+    def render(session):
+        row = session.execute(
+            select(*AUTHOR_COLUMNS, Author.updated_at).where(
+                Author.id == author_id
+            )
+        ).one_or_none()
+        if not row:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail='Author not found'
+            )
+
+        author = row._asdict()
+        updated_at = author.pop('updated_at')
+        body = dumps(author)
+        return CachedBody(body, content_etag(body), updated_at)
+
+    return await cached_read(
+        request, session, f'authors:{author_id}', {}, render
+    )
 
 
 @router.patch('/{author_id}', response_model=AuthorPublic)
@@ -82,41 +285,46 @@ def patch_author(
     user: CurrentUser,
     author: AuthorUpdate,
 ):
-    db_author = session.scalar(select(Author).where(Author.id == author_id))
+    row = session.execute(author_patch_query(author_id, author)).one_or_none()
 
-    if not db_author:
+    if not row:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Author not found.'
         )
-    if not sanitize(author.name):
+    db_author, duplicate = row
+    if not sanitize(author.name or ''):
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Empty string',
         )
 
-    check_existing_authors(session, author)
+    raise_existing_author(duplicate)
 
     # for key, value in author.model_dump(exclude_unset=True).items():
     #     setattr(db_author, key, value)
     if author.name:
         db_author.name = sanitize(author.name)
 
-    session.commit()
-    session.refresh(db_author)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise_existing_author(duplicate=True)
+    invalidate_authors(author_id)
 
     return db_author
 
 
 @router.delete('/{author_id}', response_model=Message)
 def delete_author(author_id: int, session: Session, user: CurrentUser):
-    author = session.scalar(select(Author).where(Author.id == author_id))
-
-    if not author:
+    if not delete_author_cascade(session, author_id):
+        session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Author not found.'
         )
 
-    session.delete(author)
     session.commit()
+    invalidate_authors(author_id)
+    invalidate_all_books()
 
     return {'message': 'Author has been deleted successfully.'}
@@ -1,22 +1,63 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from fast.caching import (
+    CachedBody,
+    cached_read,
+    invalidate_books,
+    page_body,
+)
 from fast.database import (
-    check_existing_author_by_id,
-    check_existing_books_from_author,
+    BOOK_COLUMNS,
+    book_patch_query,
+    existing_author_ids,
+    existing_books_from_authors,
+    get_read_session,
     get_session,
+    insert_rows,
+    raise_existing_book_from_author,
+    raise_missing_author,
+)
+from fast.importer import (
+    IMPORT_BATCH_SIZE,
+    InvalidImportFile,
+    import_books_file,
+)
+from fast.models import Author, Book, User
+from fast.schemas import (
+    BookBulkResult,
+    BookList,
+    BookPublic,
+    BookSchema,
+    BookUpdate,
+    ImportResult,
+    Message,
 )
-from fast.models import Book, User
-from fast.schemas import BookList, BookPublic, BookSchema, BookUpdate, Message
+from fast.search import trigram_contains
 from fast.security import get_current_user
+from fast.utils.conditional import content_etag
+from fast.utils.cursor import decode_cursor, encode_cursor
+from fast.utils.export import stream_export
 from fast.utils.sanitize import sanitize
+from fast.utils.serialize import dumps, page_payload
 
 router = APIRouter()
 
+ReadSession = Annotated[AsyncSession | Session, Depends(get_read_session)]
 Session = Annotated[Session, Depends(get_session)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
@@ -29,55 +70,217 @@ def create_book(
     user: CurrentUser,
     session: Session,
 ):
-    check_existing_books_from_author(session, book)
-    check_existing_author_by_id(session, book)
-
-    if not sanitize(book.title) or not book.year or not book.author_id:
+    title = sanitize(book.title)
+    if not title or not book.year or not book.author_id:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Empty field',
         )
 
-    db_book = Book(
-        year=book.year, title=sanitize(book.title), author_id=book.author_id
+    author = select(literal(book.year), literal(title), Author.id).where(
+        Author.id == book.author_id
     )
+    try:
+        db_book = session.execute(
+            insert(Book)
+            .from_select(['year', 'title', 'author_id'], author)
+            .returning(Book.id, Book.year, Book.title, Book.author_id)
+        ).one_or_none()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail='Book from this author already exists',
+        )
 
-    session.add(db_book)
+    raise_missing_author(db_book)
     session.commit()
-    session.refresh(db_book)
+    invalidate_books()
 
     return db_book
 
 
-@router.get('/', response_model=BookList)
-def list_books(  # noqa
+@router.post('/bulk', response_model=BookBulkResult)
+def create_books_bulk(
+    books: list[BookSchema],
+    user: CurrentUser,
     session: Session,
+):
+    titles = [sanitize(book.title) for book in books]
+    author_ids = existing_author_ids(session, {b.author_id for b in books})
+    existing = existing_books_from_authors(
+        session, set(zip(titles, (book.author_id for book in books)))
+    )
+
+    rows = []
+    row_indexes = []
+    conflicts = []
+    for index, (book, title) in enumerate(zip(books, titles)):
+        key = (title, book.author_id)
+        if not title or not book.year or not book.author_id:
+            conflicts.append({'index': index, 'detail': 'Empty field'})
+        elif key in existing:
+            conflicts.append({
+                'index': index,
+                'detail': 'Book from this author already exists',
+            })
+        elif book.author_id not in author_ids:
+            conflicts.append({
+                'index': index,
+                'detail': 'Author does not exist in the database',
+            })
+        else:
+            existing.add(key)
+            row_indexes.append(index)
+            rows.append({
+                'year': book.year,
+                'title': title,
+                'author_id': book.author_id,
+            })
+
+    created = []
+    if rows:
+        created, lost = insert_rows(
+            session,
+            insert(Book).returning(
+                Book.id,
+                Book.year,
+                Book.title,
+                Book.author_id,
+                sort_by_parameter_order=True,
+            ),
+            rows,
+        )
+        session.commit()
+        invalidate_books()
+        conflicts.extend(
+            {
+                'index': row_indexes[lost_index],
+                'detail': 'Book from this author already exists',
+            }
+            for lost_index in lost
+        )
+        conflicts.sort(key=lambda conflict: conflict['index'])
+
+    return {'books': created, 'conflicts': conflicts}
+
+
+@router.post('/import', response_model=ImportResult)
+def import_books_upload(
+    file: UploadFile,
+    user: CurrentUser,
+    session: Session,
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, gt=0, le=10_000),
+):
+    try:
+        return import_books_file(session, file.file, format, batch_size)
+    except InvalidImportFile as exc:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail={'message': str(exc), **exc.result},
+        )
+    finally:
+        invalidate_books()
+
+
+def find_books(  # noqa
+    session, title, year, offset, limit, cursor, author_id=None
+):
+    query = select(*BOOK_COLUMNS)
+
+    if cursor:
+        filters = decode_cursor(cursor)
+        if not filters:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor'
+            )
+        title = filters.get('title')
+        year = filters.get('year')
+        query = query.where(Book.id > filters['id'])
+    else:
+        query = query.offset(offset)
+
+    conditions = []
+    if title:
+        title = sanitize(title)
+        conditions.append(trigram_contains(Book.title, title))
+    if year:
+        conditions.append(Book.year == year)
+    if author_id:
+        conditions.append(Book.author_id == author_id)
+
+    books = session.execute(
+        query.where(*conditions).order_by(Book.id).limit(limit)
+    ).all()
+
+    next_cursor = None
+    if limit and len(books) == limit:
+        next_cursor = encode_cursor(books[-1].id, title=title, year=year)
+
+    return page_payload('books', books, next_cursor)
+
+
+@router.get('/', response_model=BookList, response_model_exclude_none=True)
+async def list_books(  # noqa
+    request: Request,
+    session: ReadSession,
     title: str = Query(None),
     year: int = Query(None),
     offset: int = Query(None),
     limit: int = Query(None),
+    cursor: str = Query(None),
 ):
-    query = select(Book)
+    params = {
+        'title': title,
+        'year': year,
+        'offset': offset,
+        'limit': limit,
+        'cursor': cursor,
+    }
 
-    if title:
-        query = query.filter(Book.title.contains(sanitize(title)))
-    if year:
-        query = query.filter(Book.year == year)
+    def render(session):
+        return page_body(find_books(session, **params))
 
-    books = session.scalars(query.offset(offset).limit(limit)).all()
+    return await cached_read(request, session, 'books:list', params, render)
 
-    return {'books': books}
+
+@router.get('/export', response_class=StreamingResponse)
+def export_books(
+    session: Session,
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+):
+    query = select(Book.id, Book.year, Book.title, Book.author_id).order_by(
+        Book.id
+    )
+
+    return stream_export(session, query, format, 'books')
 
 
 @router.get('/{book_id}', response_model=BookPublic)
-def read_book(book_id: int, session: Session):
-    db_book = session.scalar(select(Book).where(Book.id == book_id))
-    if not db_book:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND, detail='Book not found'
-        )
+async def read_book(book_id: int, request: Request, session: ReadSession):
+    def render(session):
+        row = session.execute(
+            select(*BOOK_COLUMNS, Book.updated_at).where(Book.id == book_id)
+        ).one_or_none()
+        if not row:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail='Book not found'
+            )
 
-    return db_book
+        book = row._asdict()
+        updated_at = book.pop('updated_at')
+        body = dumps(book)
+        return CachedBody(body, content_etag(body), updated_at)
+
+    return await cached_read(
+        request,
+        session,
+        f'books:{book_id}',
+        {},
+        render,
+        depends_on=('books:items',),
+    )
 
 
 @router.patch('/{book_id}', response_model=BookPublic)
@@ -87,21 +290,21 @@ def patch_book(
     user: CurrentUser,
     book: BookUpdate,
 ):
-    db_book = session.scalar(select(Book).where(Book.id == book_id))
+    row = session.execute(book_patch_query(book_id, book)).one_or_none()
 
-    if not db_book:
+    if not row:
         raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail='Book not found.'
+            status_code=HTTPStatus.NOT_FOUND, detail='Book not found.'
         )
-    if not sanitize(book.title):
+    db_book, duplicate, author_exists = row
+    if not sanitize(book.title or ''):
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Empty string',
         )
 
-    check_existing_books_from_author(session, book)
-    check_existing_author_by_id(session, book)
+    raise_existing_book_from_author(duplicate)
+    raise_missing_author(author_exists)
 
     if book.year:
         db_book.year = book.year
@@ -110,8 +313,12 @@ def patch_book(
     if book.author_id:
         db_book.author_id = book.author_id
 
-    session.commit()
-    session.refresh(db_book)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise_existing_book_from_author(duplicate=True)
+    invalidate_books(book_id)
 
     return db_book
 
@@ -127,5 +334,6 @@ def delete_book(book_id: int, session: Session, user: CurrentUser):
 
     session.delete(book)
     session.commit()
+    invalidate_books(book_id)
 
     return {'message': 'Book has been deleted successfully.'}
@@ -2,13 +2,16 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from fast.database import (
+    USER_COLUMNS,
     check_existing_users,
     check_existing_users_patch,
     get_session,
+    raise_user_integrity_error,
 )
 from fast.models import User
 from fast.schemas import (
@@ -19,10 +22,12 @@ from fast.schemas import (
     UserSchema,
 )
 from fast.security import (
+    forget_user,
     get_current_user,
     get_password_hash,
 )
 from fast.utils.sanitize import sanitize
+from fast.utils.serialize import FastJSONResponse, page_payload
 
 router = APIRouter(prefix='/users', tags=['users'])
 
@@ -38,37 +43,48 @@ def create_user(user: UserSchema, session: Session):
             detail='Empty string',
         )
 
+    # Fail fast on duplicates before paying for the Argon2 hash; the
+    # unique constraints still catch concurrent signups.
     check_existing_users(session, user)
     hashed_password = get_password_hash(user.password)
 
-    db_user = User(
-        email=user.email,
-        username=sanitize(user.username),
-        password=hashed_password,
-    )
-
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    try:
+        db_user = session.execute(
+            insert(User)
+            .values(
+                email=user.email,
+                username=sanitize(user.username),
+                password=hashed_password,
+            )
+            .returning(User.id, User.username, User.email)
+        ).one()
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        raise_user_integrity_error(exc)
 
     return db_user
 
 
 @router.get('/', response_model=UserList)
 def read_users(session: Session, skip: int = 0, limit: int = 100):
-    users = session.scalars(select(User).offset(skip).limit(limit)).all()
-    return {'users': users}
+    users = session.execute(
+        select(*USER_COLUMNS).order_by(User.id).offset(skip).limit(limit)
+    ).all()
+    return FastJSONResponse(page_payload('users', users))
 
 
 @router.get('/{user_id}', response_model=UserPublic)
 def read_user(user_id: int, session: Session):
-    db_user = session.scalar(select(User).where(User.id == user_id))
+    db_user = session.execute(
+        select(*USER_COLUMNS).where(User.id == user_id)
+    ).one_or_none()
     if not db_user:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='User not found'
         )
 
-    return db_user
+    return FastJSONResponse(db_user._asdict())
 
 
 @router.patch('/{user_id}', response_model=UserPublic)
@@ -90,17 +106,20 @@ def patch_user(
         )
 
     check_existing_users_patch(session, user)
-    hashed_password = get_password_hash(user.password)
 
     if user.username:
         current_user.username = sanitize(user.username)
     if user.password:
-        current_user.password = hashed_password
+        current_user.password = get_password_hash(user.password)
     if user.email:
         current_user.email = user.email
 
-    session.commit()
-    session.refresh(current_user)
+    try:
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        raise_user_integrity_error(exc)
+    forget_user(current_user.id)
 
     return current_user
 
@@ -129,8 +148,12 @@ def update_user(
     current_user.username = sanitize(user.username)
     current_user.password = hashed_password
     current_user.email = user.email
-    session.commit()
-    session.refresh(current_user)
+    try:
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        raise_user_integrity_error(exc)
+    forget_user(current_user.id)
 
     return current_user
 
@@ -148,5 +171,6 @@ def delete_user(
 
     session.delete(current_user)
     session.commit()
+    forget_user(user_id)
 
     return {'message': 'User deleted'}
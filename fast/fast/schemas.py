@@ -37,6 +37,11 @@ class TokenData(BaseModel):
     username: str | None = None
 
 
+class BulkConflict(BaseModel):
+    index: int
+    detail: str
+
+
 class AuthorSchema(BaseModel):
     name: str
 
@@ -50,8 +55,9 @@ class AuthorUpdate(BaseModel):
     name: str | None = None
 
 
-class AuthorList(BaseModel):
+class AuthorBulkResult(BaseModel):
     authors: list[AuthorPublic]
+    conflicts: list[BulkConflict]
 
 
 class BookSchema(BaseModel):
@@ -65,6 +71,16 @@ class BookPublic(BookSchema):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AuthorWithBooks(AuthorPublic):
+    books: list[BookPublic] | None = None
+    books_next_cursor: str | None = None
+
+
+class AuthorList(BaseModel):
+    authors: list[AuthorWithBooks]
+    next_cursor: str | None = None
+
+
 class BookUpdate(BaseModel):
     year: int | None = None
     title: str | None = None
@@ -73,3 +89,16 @@ class BookUpdate(BaseModel):
 
 class BookList(BaseModel):
     books: list[BookPublic]
+    next_cursor: str | None = None
+
+
+class BookBulkResult(BaseModel):
+    books: list[BookPublic]
+    conflicts: list[BulkConflict]
+
+
+class ImportResult(BaseModel):
+    imported: int
+    skipped: int
+    seconds: float
+    rows_per_second: float
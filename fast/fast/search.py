@@ -0,0 +1,113 @@
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    String,
+    bindparam,
+    column,
+    event,
+    literal_column,
+    select,
+)
+from sqlalchemy import table as table_clause
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from fast.models import Author, Book
+
+SQLITE_INDEX = [
+    "CREATE VIRTUAL TABLE {search} USING fts5({column}, content='{table}', "
+    "content_rowid='id', tokenize='trigram')",
+    'CREATE TRIGGER {search}_ai AFTER INSERT ON {table} BEGIN '
+    'INSERT INTO {search}(rowid, {column}) VALUES (new.id, new.{column}); '
+    'END',
+    'CREATE TRIGGER {search}_ad AFTER DELETE ON {table} BEGIN '
+    'INSERT INTO {search}({search}, rowid, {column}) '
+    "VALUES ('delete', old.id, old.{column}); "
+    'END',
+    'CREATE TRIGGER {search}_au AFTER UPDATE OF {column} ON {table} BEGIN '
+    'INSERT INTO {search}({search}, rowid, {column}) '
+    "VALUES ('delete', old.id, old.{column}); "
+    'INSERT INTO {search}(rowid, {column}) VALUES (new.id, new.{column}); '
+    'END',
+]
+
+POSTGRESQL_INDEX = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm '
+    'ON {table} USING gin ({column} gin_trgm_ops)',
+]
+
+
+def search_table_name(table):
+    return f'{table.name}_search'
+
+
+def register_search_index(model, column_name):
+    table = model.__table__
+    names = {
+        'table': table.name,
+        'column': column_name,
+        'search': search_table_name(table),
+    }
+
+    for statement in SQLITE_INDEX:
+        event.listen(
+            table,
+            'after_create',
+            DDL(statement.format(**names)).execute_if(dialect='sqlite'),
+        )
+    for statement in POSTGRESQL_INDEX:
+        event.listen(
+            table,
+            'after_create',
+            DDL(statement.format(**names)).execute_if(dialect='postgresql'),
+        )
+
+    event.listen(
+        table,
+        'before_drop',
+        DDL('DROP TABLE IF EXISTS {search}'.format(**names)).execute_if(
+            dialect='sqlite'
+        ),
+    )
+
+
+class TrigramContains(ColumnElement):
+    inherit_cache = True
+    type = Boolean()
+    _is_implicitly_boolean = True
+
+    _traverse_internals = [
+        ('column', InternalTraversal.dp_clauseelement),
+        ('term', InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column, term):
+        self.column = column
+        self.term = term
+
+
+def trigram_contains(column, term):
+    return TrigramContains(column, bindparam(None, term, type_=String))
+
+
+@compiles(TrigramContains)
+def _compile_trigram_contains(element, compiler, **kw):
+    return compiler.process(element.column.contains(element.term), **kw)
+
+
+@compiles(TrigramContains, 'sqlite')
+def _compile_trigram_contains_sqlite(element, compiler, **kw):
+    table = element.column.table
+    search = table_clause(
+        search_table_name(table), column(element.column.name)
+    )
+    matches = select(literal_column('rowid')).where(
+        search.c[element.column.name].contains(element.term)
+    )
+    return compiler.process(table.c.id.in_(matches), **kw)
+
+
+register_search_index(Book, 'title')
+register_search_index(Author, 'name')
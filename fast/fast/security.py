@@ -1,24 +1,84 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from http import HTTPStatus
+from threading import BoundedSemaphore
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
 from pwdlib import PasswordHash
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
 from zoneinfo import ZoneInfo
 
 from fast.database import get_session
+from fast.metrics import password_hash_duration
 from fast.models import User
 from fast.schemas import TokenData
 from fast.settings import Settings
+from fast.utils.cache import TTLCache
 
-pwd_context = PasswordHash.recommended()
+
+def password_context(low_cost: bool = False):
+    # The low-cost profile is for test suites only: it keeps the Argon2
+    # format, so hashes still verify, but skips the work factor.
+    if low_cost:
+        return PasswordHash((
+            Argon2Hasher(time_cost=1, memory_cost=8, parallelism=1),
+        ))
+    return PasswordHash.recommended()
+
+
+pwd_context = password_context()
 
 settings = Settings()
 
 
+class HashWorkerPool:
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.retry_after = retry_after
+        self.slots = BoundedSemaphore(max_pending)
+        self.executor = None
+
+    def start(self):
+        if self.workers and self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+
+        if not self.slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Server busy, try again later',
+                headers={'Retry-After': str(self.retry_after)},
+            )
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+
+hash_pool = HashWorkerPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
@@ -31,21 +91,60 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_password_hash(password: str):
+def hash_password(password: str):
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str):
+def check_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def get_password_hash(password: str):
+    with password_hash_duration.time(('hash',)):
+        return hash_pool.run(hash_password, password)
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    with password_hash_duration.time(('verify',)):
+        return hash_pool.run(check_password, plain_password, hashed_password)
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 
 
-async def get_current_user(
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL
+)
+
+
+def user_identity(user: User):
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+    }
+
+
+def load_cached_user(session: Session, identity: dict):
+    user = inspect(User).class_manager.new_instance()
+    for key, value in identity.items():
+        setattr(user, key, value)
+    make_transient_to_detached(user)
+
+    return session.merge(user, load=False)
+
+
+def forget_user(user_id: int):
+    token_cache.delete_where(lambda identity: identity['id'] == user_id)
+
+
+def get_current_user(
     session: Session = Depends(get_session),
     token: str = Depends(oauth2_scheme),
 ):
+    identity = token_cache.get(token)
+    if identity is not None:
+        return load_cached_user(session, identity)
+
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
@@ -72,4 +171,8 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    token_cache.set(
+        token, user_identity(user), ttl=payload['exp'] - time.time()
+    )
+
     return user
@@ -10,3 +10,23 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    ASYNC_DATABASE_URL: str | None = None
+    DB_POOL_SIZE: int | None = None
+    DB_MAX_OVERFLOW: int | None = None
+    DB_POOL_TIMEOUT: float | None = None
+    DB_POOL_RECYCLE: int | None = None
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_PREWARM: int = 0
+    DB_POOL_RETRY_AFTER: int = 1
+    THREADPOOL_SIZE: int | None = None
+
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+
+    TOKEN_CACHE_SIZE: int = 1024
+    TOKEN_CACHE_TTL: int = 60
+
+    RESPONSE_CACHE_SIZE: int = 4096
+    RESPONSE_CACHE_TTL: int = 30
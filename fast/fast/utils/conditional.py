@@ -0,0 +1,59 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+
+
+def as_utc(moment: datetime):
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=UTC)
+    return moment.astimezone(UTC)
+
+
+def etag_part(part):
+    if isinstance(part, datetime):
+        return str(int(as_utc(part).timestamp()))
+    return str(part)
+
+
+def content_etag(body: bytes, *parts, weak: bool = False):
+    digest = blake2b(body, digest_size=16).hexdigest()
+    tag = '-'.join([*(etag_part(part) for part in parts), digest])
+    return f'W/"{tag}"' if weak else f'"{tag}"'
+
+
+def http_date(moment: datetime):
+    return format_datetime(as_utc(moment).replace(microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str):
+    if if_none_match.strip() == '*':
+        return True
+
+    opaque = etag.removeprefix('W/')
+    return any(
+        tag.strip().removeprefix('W/') == opaque
+        for tag in if_none_match.split(',')
+    )
+
+
+def modified_since(if_modified_since: str, last_modified: datetime):
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        return True
+
+    return as_utc(last_modified).replace(microsecond=0) > since
+
+
+def is_not_modified(headers, etag: str, last_modified: datetime | None):
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        return not modified_since(if_modified_since, last_modified)
+
+    return False
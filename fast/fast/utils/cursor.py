@@ -0,0 +1,33 @@
+import base64
+import binascii
+import json
+
+CURSOR_FIELDS = {'id': int, 'title': str, 'name': str, 'year': int}
+MAX_INTEGER = 2**63 - 1
+
+
+def valid_field(key, value):
+    kind = CURSOR_FIELDS.get(key)
+    if kind is int:
+        return type(value) is int and -MAX_INTEGER - 1 <= value <= MAX_INTEGER
+    return kind is not None and type(value) is kind
+
+
+def encode_cursor(last_id, **filters):
+    payload = {'id': last_id}
+    payload.update({key: value for key, value in filters.items() if value})
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(payload, dict) or 'id' not in payload:
+        return None
+    if not all(valid_field(key, value) for key, value in payload.items()):
+        return None
+    return payload
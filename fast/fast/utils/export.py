@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_CHUNK_SIZE = 1000
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def encode_ndjson(partitions, fields):
+    for rows in partitions:
+        yield ''.join(
+            json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n'
+            for row in rows
+        )
+
+
+def encode_csv(partitions, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(fields)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(session, query, export_format, filename):
+    fields = list(query.selected_columns.keys())
+    encode = encode_csv if export_format == 'csv' else encode_ndjson
+
+    def content():
+        try:
+            result = session.execute(
+                query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+            )
+            yield from encode(result.partitions(), fields)
+        finally:
+            session.close()
+
+    return StreamingResponse(
+        content(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="{filename}.{export_format}"'
+            )
+        },
+    )
@@ -1,6 +1,37 @@
+import re
+from functools import lru_cache
+
+SANITIZE_CACHE_SIZE = 4096
+# Longer inputs (request bodies, imported titles) are not memoized, so the
+# cache holds at most SANITIZE_CACHE_SIZE short strings.
+SANITIZE_CACHE_MAX_LENGTH = 256
+
+# Characters that are neither str.isalnum() nor str.isspace(); `\w` also
+# matches the underscore, which isalnum() rejects.
+NOT_ALNUM_OR_SPACE = re.compile(r'[^\w\s]|_')
+ASCII_NOT_ALNUM_OR_SPACE = str.maketrans(
+    '',
+    '',
+    ''.join(
+        char
+        for char in map(chr, range(128))
+        if not (char.isalnum() or char.isspace())
+    ),
+)
+
+
+def normalize(string):
+    if string.isascii():
+        alpha = string.translate(ASCII_NOT_ALNUM_OR_SPACE)
+    else:
+        alpha = NOT_ALNUM_OR_SPACE.sub('', string)
+    return ' '.join(alpha.split()).lower()
+
+
+cached_normalize = lru_cache(maxsize=SANITIZE_CACHE_SIZE)(normalize)
+
+
 def sanitize(string):
-    alpha = ''.join(
-        char for char in string if char.isalnum() or char.isspace()
-    )
-    sanitized = ' '.join(alpha.split()).lower()
-    return sanitized
+    if len(string) > SANITIZE_CACHE_MAX_LENGTH:
+        return normalize(string)
+    return cached_normalize(string)
@@ -0,0 +1,35 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+def row_dicts(rows):
+    if not rows:
+        return []
+    fields = rows[0]._fields
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def page_payload(name: str, rows, next_cursor: str | None = None):
+    payload = {name: row_dicts(rows)}
+    if next_cursor is not None:
+        payload['next_cursor'] = next_cursor
+    return payload
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:  # noqa: PLR6301
+        return dumps(content)
@@ -0,0 +1,73 @@
+"""add trigram search indexes
+
+Revision ID: 1690828e4ceb
+Revises: 581636bd4016
+Create Date: 2026-10-18 19:15:02.412871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1690828e4ceb'
+down_revision: Union[str, None] = '581636bd4016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = [('books', 'title'), ('authors', 'name')]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    for table, column in SEARCH_COLUMNS:
+        search = f'{table}_search'
+        if dialect == 'sqlite':
+            op.execute(
+                f"CREATE VIRTUAL TABLE {search} USING fts5({column}, "
+                f"content='{table}', content_rowid='id', tokenize='trigram')"
+            )
+            op.execute(
+                f'CREATE TRIGGER {search}_ai AFTER INSERT ON {table} BEGIN '
+                f'INSERT INTO {search}(rowid, {column}) '
+                f'VALUES (new.id, new.{column}); END'
+            )
+            op.execute(
+                f'CREATE TRIGGER {search}_ad AFTER DELETE ON {table} BEGIN '
+                f'INSERT INTO {search}({search}, rowid, {column}) '
+                f"VALUES ('delete', old.id, old.{column}); END"
+            )
+            op.execute(
+                f'CREATE TRIGGER {search}_au AFTER UPDATE OF {column} '
+                f'ON {table} BEGIN '
+                f'INSERT INTO {search}({search}, rowid, {column}) '
+                f"VALUES ('delete', old.id, old.{column}); "
+                f'INSERT INTO {search}(rowid, {column}) '
+                f'VALUES (new.id, new.{column}); END'
+            )
+            op.execute(f"INSERT INTO {search}({search}) VALUES ('rebuild')")
+        elif dialect == 'postgresql':
+            op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    for table, column in SEARCH_COLUMNS:
+        search = f'{table}_search'
+        if dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {search}_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {search}')
+        elif dialect == 'postgresql':
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
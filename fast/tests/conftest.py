@@ -1,14 +1,20 @@
+import re
+from contextlib import contextmanager
+
 import factory
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
 from fast.app import app
-from fast.database import get_session
+from fast.caching import response_cache
+from fast.database import get_read_session, get_session
+from fast.instrumentation import TRANSACTION_CONTROL, instrument_engine
 from fast.models import Author, Book, User, table_registry
-from fast.security import get_password_hash
+from fast.security import get_password_hash, password_context, token_cache
 
 
 class UserFactory(factory.Factory):
@@ -20,6 +26,56 @@ class UserFactory(factory.Factory):
     password = factory.LazyAttribute(lambda obj: f'{obj.username}@example.com')
 
 
+FULL_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+class QueryLog:
+    def __init__(self, session):
+        self.session = session
+        self.statements = []
+
+    def capture(self, conn, cursor, statement, parameters, *args):
+        context, executemany = args
+        if not statement.startswith(('EXPLAIN', *TRANSACTION_CONTROL)):
+            self.statements.append((statement, parameters, executemany))
+
+    def plan(self, statement, parameters):
+        return [
+            row[-1]
+            for row in self.session.connection().exec_driver_sql(
+                f'EXPLAIN QUERY PLAN {statement}', parameters
+            )
+        ]
+
+    def full_scans(self):
+        tables = table_registry.metadata.tables
+        scans = []
+        for statement, parameters, executemany in self.statements:
+            # EXPLAIN takes one parameter set; executemany statements
+            # still count toward the budget.
+            if executemany:
+                continue
+            plan = self.plan(statement, parameters)
+            if any(
+                (match := FULL_SCAN.match(step)) and match[1] in tables
+                for step in plan
+            ):
+                scans.append((statement, plan))
+        return scans
+
+    @contextmanager
+    def budget(self, max_queries):
+        self.statements.clear()
+        yield self
+
+        assert len(self.statements) <= max_queries, (
+            f'{len(self.statements)} queries over a budget of {max_queries}:',
+            [statement for statement, *_ in self.statements],
+        )
+        scans = self.full_scans()
+        assert not scans, scans
+
+
 @pytest.fixture()
 def client(session):
     def get_session_override():
@@ -27,24 +83,101 @@ def client(session):
 
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
         yield client
 
     app.dependency_overrides.clear()
+    token_cache.clear()
+    response_cache.clear()
 
 
-@pytest.fixture()
-def session():
+@pytest.fixture(scope='session', autouse=True)
+def low_cost_password_hash():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(
+            'fast.security.pwd_context', password_context(low_cost=True)
+        )
+        yield
+
+
+@pytest.fixture(scope='session')
+def engine():
     engine = create_engine(
         'sqlite:///:memory:',
         connect_args={'check_same_thread': False},
         poolclass=StaticPool,
     )
-    table_registry.metadata.create_all(engine)
 
-    with Session(engine) as session:
-        yield session
+    # pysqlite opens its own transactions and never emits SAVEPOINT
+    # correctly, so hand transaction control to SQLAlchemy.
+    @event.listens_for(engine, 'connect')
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def begin_transaction(connection):
+        connection.exec_driver_sql('BEGIN')
 
+    instrument_engine(engine)
+    table_registry.metadata.create_all(engine)
+    yield engine
     table_registry.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture()
+def session(engine):
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(
+            bind=connection,
+            join_transaction_mode='create_savepoint',
+            expire_on_commit=False,
+        ) as session:
+            yield session
+        transaction.rollback()
+
+
+@pytest.fixture()
+def async_client(tmp_path):
+    pytest.importorskip('aiosqlite')
+    database = f'{tmp_path}/async.db'
+    engine = create_engine(f'sqlite:///{database}')
+    async_engine = create_async_engine(f'sqlite+aiosqlite:///{database}')
+    instrument_engine(async_engine.sync_engine)
+    table_registry.metadata.create_all(engine)
+
+    def get_session_override():
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+
+    async def get_read_session_override():
+        async with AsyncSession(
+            async_engine, expire_on_commit=False
+        ) as session:
+            client.read_sessions.append(session)
+            yield session
+
+    with TestClient(app) as client:
+        client.read_sessions = []
+        client.engine = engine
+        app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_read_session_override
+        yield client
+        client.portal.call(async_engine.dispose)
+
+    app.dependency_overrides.clear()
+    response_cache.clear()
+    engine.dispose()
+
+
+@pytest.fixture()
+def queries(engine, session):
+    log = QueryLog(session)
+
+    event.listen(engine, 'before_cursor_execute', log.capture)
+    yield log
+    event.remove(engine, 'before_cursor_execute', log.capture)
 
 
 @pytest.fixture()
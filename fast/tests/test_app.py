@@ -1,4 +1,14 @@
+import sys
 from http import HTTPStatus
+from threading import Thread
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from fast.app import app
+from fast.database import get_session
+from fast.instrumentation import QueryStats, record_request, route_stats
+from fast.metrics import pool_timeouts, registry
 
 
 def test_read_root_return_ok_and_message(client):
@@ -6,3 +16,101 @@ def test_read_root_return_ok_and_message(client):
 
     assert response.status_code == HTTPStatus.OK
     assert response.json() == {'message': 'Hello world'}
+
+
+def test_server_timing_reports_query_count(client, book):
+    response = client.get(f'/books/{book.id}')
+
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'desc="1 queries"' in timing
+    assert 'app;dur=' in timing
+
+
+def test_query_stats_are_aggregated_per_route(client, book):
+    route_stats.clear()
+
+    client.get(f'/books/{book.id}')
+    client.get(f'/books/{book.id + 1}')
+    client.get('/missing')
+
+    stats = route_stats['/books/{book_id}']
+    assert stats.requests == 2  # noqa: PLR2004
+    assert stats.queries == 2  # noqa: PLR2004
+    assert stats.handler_time >= stats.db_time > 0
+    assert route_stats['unmatched'].queries == 0
+
+
+def test_metrics_scrape_while_new_routes_are_recorded():
+    def record_routes():
+        for index in range(20_000):
+            record_request(f'/route/{index}', QueryStats(1, 0.001), 0.002)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    recorder = Thread(target=record_routes)
+    recorder.start()
+    try:
+        while recorder.is_alive():
+            registry.render()
+    finally:
+        recorder.join()
+        sys.setswitchinterval(interval)
+        for index in range(20_000):
+            route_stats.pop(f'/route/{index}', None)
+
+
+def test_metrics_exposes_route_latency_and_pool_stats(client, book):
+    client.get(f'/books/{book.id}')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    body = response.text
+    assert (
+        'http_request_duration_seconds_bucket'
+        '{method="GET",route="/books/{book_id}",le="+Inf"}'
+    ) in body
+    assert 'http_requests_in_flight 1' in body
+    assert 'db_pool_checkout_wait_seconds_count' in body
+    assert '# TYPE db_pool_checkedout gauge' in body
+    assert 'http_route_queries_total{route="/books/{book_id}"}' in body
+
+
+def test_metrics_records_password_hash_duration(client):
+    client.post(
+        '/users/',
+        json={
+            'username': 'metrics',
+            'email': 'metrics@test.com',
+            'password': 'secret',
+        },
+    )
+
+    body = client.get('/metrics').text
+
+    assert 'password_hash_duration_seconds_count{operation="hash"}' in body
+
+
+def test_pool_exhaustion_returns_503(client, tmp_path):
+    engine = create_engine(
+        f'sqlite:///{tmp_path}/busy.db',
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    before = pool_timeouts.samples().get((), 0)
+
+    with engine.connect():
+        response = client.get('/users/')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+    assert pool_timeouts.samples()[()] == before + 1
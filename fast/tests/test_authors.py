@@ -1,7 +1,15 @@
+import base64
 from http import HTTPStatus
 
+import factory
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from fast.database import NESTED_BOOKS_LIMIT
+from fast.models import Author, Book
 from fast.schemas import AuthorPublic
-from tests.factories import AuthorFactory
+from tests.factories import AuthorFactory, BookFactory
 
 # from fast.utils.sanitize import sanitize
 
@@ -27,6 +35,28 @@ def test_read_author(client, author):
     }
 
 
+def test_author_reads_run_on_async_session(async_client):
+    with Session(async_client.engine) as session:
+        session.add(Author(name='asimov'))
+        session.flush()
+        session.add(Book(year=1951, title='foundation', author_id=1))
+        session.commit()
+
+    listing = async_client.get('/authors/', params={'include': 'books'})
+    author = async_client.get('/authors/1')
+    books = async_client.get('/authors/1/books')
+    missing = async_client.get('/authors/99/books')
+
+    assert listing.json()['authors'][0]['books'][0]['title'] == 'foundation'
+    assert author.json() == {'id': 1, 'name': 'asimov'}
+    assert [book['id'] for book in books.json()['books']] == [1]
+    assert missing.status_code == HTTPStatus.NOT_FOUND
+    assert all(
+        isinstance(session, AsyncSession)
+        for session in async_client.read_sessions
+    )
+
+
 def test_read_author_not_found_404(client, author):
     response = client.get('/authors/2')
     assert response.status_code == HTTPStatus.NOT_FOUND
@@ -50,8 +80,16 @@ def test_list_authors_filter_name_should_return_3_authors(
     session, client, token
 ):
     expected_authors = 3
-    session.bulk_save_objects(AuthorFactory.create_batch(3, name='george'))
-    session.bulk_save_objects(AuthorFactory.create_batch(2, name='isaac'))
+    session.bulk_save_objects(
+        AuthorFactory.create_batch(
+            3, name=factory.Sequence(lambda n: f'george {n}')
+        )
+    )
+    session.bulk_save_objects(
+        AuthorFactory.create_batch(
+            2, name=factory.Sequence(lambda n: f'isaac {n}')
+        )
+    )
 
     session.commit()
 
@@ -63,6 +101,36 @@ def test_list_authors_filter_name_should_return_3_authors(
     assert len(response.json()['authors']) == expected_authors
 
 
+def test_list_authors_cursor_pagination(session, client):
+    session.bulk_save_objects(AuthorFactory.create_batch(3))
+    session.commit()
+
+    response = client.get('/authors/?limit=2')
+    first_page = response.json()
+    assert [author['id'] for author in first_page['authors']] == [1, 2]
+
+    response = client.get(
+        f'/authors/?limit=2&cursor={first_page["next_cursor"]}'
+    )
+    assert [author['id'] for author in response.json()['authors']] == [3]
+    assert 'next_cursor' not in response.json()
+
+
+def test_list_authors_forged_cursor_400(client):
+    cursor = base64.urlsafe_b64encode(b'{"id":0,"name":["x"]}').decode()
+
+    response = client.get('/authors/', params={'cursor': cursor})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_list_authors_invalid_cursor_400(client):
+    response = client.get('/authors/?cursor=invalid')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
 def test_create_author(client, token):
     response = client.post(
         '/authors/',
@@ -135,6 +203,28 @@ def test_patch_author_conflict_409(client, token, author):
     assert response.json() == {'detail': 'Author already exists'}
 
 
+def test_patch_author_concurrent_duplicate_409(
+    client, session, token, author, monkeypatch
+):
+    monkeypatch.setattr(
+        'fast.routers.authors.author_patch_query',
+        lambda author_id, author: select(Author, literal(False)).where(
+            Author.id == author_id
+        ),
+    )
+    session.add(Author(name='isaac asimov'))
+    session.commit()
+
+    response = client.patch(
+        '/authors/2',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'name': 'George Orwell'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Author already exists'}
+
+
 def test_patch_author_not_found_404(client, token):
     response = client.patch(
         '/authors/10',
@@ -168,3 +258,134 @@ def test_delete_author_not_found_404(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Author not found.'}
+
+
+def test_create_authors_bulk(client, token, author):
+    response = client.post(
+        '/authors/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'name': 'Isaac Asimov'},
+            {'name': 'George Orwell'},
+            {'name': 'isaac   asimov'},
+            {'name': '   '},
+            {'name': 'Ursula K. Le Guin'},
+        ],
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'authors': [
+            {'name': 'isaac asimov', 'id': 2},
+            {'name': 'ursula k le guin', 'id': 3},
+        ],
+        'conflicts': [
+            {'index': 1, 'detail': 'Author already exists'},
+            {'index': 2, 'detail': 'Author already exists'},
+            {'index': 3, 'detail': 'Empty string'},
+        ],
+    }
+
+
+def test_create_authors_bulk_reports_concurrent_duplicates(
+    client, token, author, monkeypatch
+):
+    monkeypatch.setattr(
+        'fast.routers.authors.existing_author_names',
+        lambda session, names: set(),
+    )
+
+    response = client.post(
+        '/authors/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[{'name': 'Isaac Asimov'}, {'name': 'George Orwell'}],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'authors': [{'id': 2, 'name': 'isaac asimov'}],
+        'conflicts': [{'index': 1, 'detail': 'Author already exists'}],
+    }
+
+
+def test_export_authors_csv(client, author):
+    response = client.get('/authors/export?format=csv')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.text.splitlines() == ['id,name', '1,george orwell']
+
+
+def test_delete_author_invalidates_cached_books(client, token, author, book):
+    client.get(f'/authors/{author.id}')
+    client.get(f'/books/{book.id}')
+
+    client.delete(
+        f'/authors/{author.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert client.get(f'/authors/{author.id}').status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.get(f'/books/{book.id}').status_code == HTTPStatus.NOT_FOUND
+
+
+def test_list_authors_include_books_pages_nested_books(session, client):
+    authors = AuthorFactory.create_batch(2)
+    session.add_all(authors)
+    session.commit()
+    session.add_all(
+        BookFactory.build_batch(3, author_id=authors[0].id)
+        + BookFactory.build_batch(1, author_id=authors[1].id)
+    )
+    session.commit()
+
+    response = client.get('/authors/?include=books&books_limit=2')
+
+    first, second = response.json()['authors']
+    assert [book['author_id'] for book in first['books']] == [
+        authors[0].id
+    ] * 2
+    assert len(second['books']) == 1
+    assert 'books_next_cursor' not in second
+    assert 'desc="2 queries"' in response.headers['Server-Timing']
+
+    rest = client.get(
+        f'/authors/{authors[0].id}/books',
+        params={'cursor': first['books_next_cursor']},
+    ).json()
+    assert [book['id'] for book in rest['books']] == [3]
+
+
+def test_list_authors_include_books_sees_new_books(client, token, author):
+    client.get('/authors/?include=books')
+
+    client.post(
+        '/books/',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'year': 1949, 'title': '1984', 'author_id': author.id},
+    )
+
+    response = client.get('/authors/?include=books')
+    assert response.json()['authors'][0]['books'][0]['title'] == '1984'
+
+
+def test_list_author_books_pages_by_default(session, client, author):
+    session.bulk_save_objects(
+        BookFactory.build_batch(NESTED_BOOKS_LIMIT + 1, author_id=author.id)
+    )
+    session.commit()
+
+    page = client.get(f'/authors/{author.id}/books').json()
+    too_large = client.get(
+        f'/authors/{author.id}/books', params={'limit': 101}
+    )
+
+    assert len(page['books']) == NESTED_BOOKS_LIMIT
+    assert page['next_cursor']
+    assert too_large.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_list_author_books_not_found(client):
+    response = client.get('/authors/10/books')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Author not found'}
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+
+from benchmarks.cascade_delete import main as cascade_delete_main
+from benchmarks.catalog import main
+from benchmarks.common import (
+    NullCache,
+    benchmark_client,
+    benchmark_engine,
+    find_regressions,
+)
+from benchmarks.sanitize import main as sanitize_main
+from benchmarks.serialization import main as serialization_main
+from fast.caching import response_cache
+from fast.models import Author, table_registry
+
+
+def test_catalog_benchmark_writes_results(tmp_path):
+    output = tmp_path / 'results.json'
+
+    exit_code = main([
+        '--authors=3',
+        '--books-per-author=2',
+        '--requests=2',
+        '--warmup=0',
+        '--only',
+        'read_book',
+        'list_books_by_year',
+        f'--output={output}',
+    ])
+
+    results = json.loads(output.read_text())
+    assert exit_code == 0
+    assert results['database'] == 'sqlite'
+    assert set(results['scenarios']) == {'read_book', 'list_books_by_year'}
+    assert results['scenarios']['read_book']['requests'] == 2  # noqa: PLR2004
+    assert results['parameters']['response_cache'] is False
+
+
+def test_benchmark_client_bypasses_response_cache_by_default():
+    backend = response_cache.backend
+
+    with benchmark_engine() as engine:
+        with benchmark_client(engine):
+            assert isinstance(response_cache.backend, NullCache)
+        with benchmark_client(engine, response_caching=True):
+            assert response_cache.backend is backend
+
+    assert response_cache.backend is backend
+
+
+def test_benchmark_engine_refuses_databases_with_data(tmp_path):
+    database_url = f'sqlite:///{tmp_path}/live.db'
+    engine = create_engine(database_url)
+    table_registry.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Author).values(name='kept'))
+
+    with pytest.raises(SystemExit, match='authors'):
+        with benchmark_engine(database_url):
+            pass
+
+    with engine.connect() as connection:
+        assert connection.scalars(select(Author.name)).all() == ['kept']
+    engine.dispose()
+
+
+def test_find_regressions_flags_throughput_and_p99():
+    baseline = {
+        'scenarios': {
+            'read_book': {'throughput': 100.0, 'p99_ms': 10.0},
+            'create_book': {'throughput': 50.0, 'p99_ms': 20.0},
+        }
+    }
+    results = {
+        'scenarios': {
+            'read_book': {'throughput': 80.0, 'p99_ms': 13.0},
+            'create_book': {'throughput': 48.0, 'p99_ms': 21.0},
+            'auth_token': {'throughput': 5.0, 'p99_ms': 300.0},
+        }
+    }
+
+    assert find_regressions(results, baseline, 0.1) == [
+        'read_book: throughput 100.0 -> 80.0 req/s',
+        'read_book: p99 10.0 -> 13.0 ms',
+    ]
+
+
+def test_serialization_benchmark_compares_paths(tmp_path):
+    output = tmp_path / 'results.json'
+
+    exit_code = serialization_main([
+        '--rows=20',
+        '--requests=2',
+        '--warmup=0',
+        f'--output={output}',
+    ])
+
+    results = json.loads(output.read_text())
+    assert exit_code == 0
+    assert {'orm_pydantic', 'tuples_fast_json'} <= set(results['scenarios'])
+
+
+def test_cascade_delete_benchmark_compares_strategies(tmp_path):
+    output = tmp_path / 'results.json'
+
+    exit_code = cascade_delete_main([
+        '--books=20',
+        '--requests=1',
+        f'--output={output}',
+    ])
+
+    results = json.loads(output.read_text())
+    assert exit_code == 0
+    assert set(results['scenarios']) == {'orm_cascade', 'bulk_delete'}
+
+
+def test_sanitize_benchmark_covers_unicode_and_ascii(tmp_path):
+    output = tmp_path / 'results.json'
+
+    exit_code = sanitize_main([
+        '--titles=3',
+        '--length=40',
+        '--requests=2',
+        '--warmup=0',
+        f'--output={output}',
+    ])
+
+    results = json.loads(output.read_text())
+    assert exit_code == 0
+    assert {'unicode_legacy', 'unicode_uncached', 'ascii_cached_3x'} <= set(
+        results['scenarios']
+    )
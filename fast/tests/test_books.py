@@ -1,5 +1,13 @@
+import base64
+import json
 from http import HTTPStatus
 
+import factory
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from fast.models import Author, Book
 from fast.schemas import BookPublic
 from tests.factories import BookFactory
 
@@ -29,6 +37,33 @@ def test_read_book(client, book):
     }
 
 
+def test_book_reads_run_on_async_session(async_client):
+    with Session(async_client.engine) as session:
+        session.add(Author(name='asimov'))
+        session.flush()
+        session.add_all([
+            Book(year=1951, title='foundation', author_id=1),
+            Book(year=1950, title='i robot', author_id=1),
+        ])
+        session.commit()
+
+    listing = async_client.get('/books/', params={'year': 1951})
+    book = async_client.get('/books/2')
+    missing = async_client.get('/books/99')
+
+    assert listing.json()['books'] == [
+        {'id': 1, 'year': 1951, 'title': 'foundation', 'author_id': 1}
+    ]
+    assert 'desc="1 queries"' in listing.headers['Server-Timing']
+    assert book.json()['title'] == 'i robot'
+    assert missing.status_code == HTTPStatus.NOT_FOUND
+    assert all(
+        isinstance(session, AsyncSession)
+        for session in async_client.read_sessions
+    )
+    assert len(async_client.read_sessions) == 3  # noqa: PLR2004
+
+
 def test_read_book_not_found_404(client, book):
     response = client.get('/books/2')
     assert response.status_code == HTTPStatus.NOT_FOUND
@@ -50,9 +85,17 @@ def test_list_books_should_return_5_books(session, client, token):
 
 def test_list_books_filter_title_should_return_3_books(session, client, token):
     expected_books = 3
-    session.bulk_save_objects(BookFactory.create_batch(3, title='fundação'))
     session.bulk_save_objects(
-        BookFactory.create_batch(2, title='o fim da eternidade')
+        BookFactory.create_batch(
+            3, title='fundação', author_id=factory.Sequence(lambda n: n)
+        )
+    )
+    session.bulk_save_objects(
+        BookFactory.create_batch(
+            2,
+            title='o fim da eternidade',
+            author_id=factory.Sequence(lambda n: n),
+        )
     )
 
     session.commit()
@@ -86,7 +129,12 @@ def test_list_books_filter_title_and_year_should_return_2_books(
     expected_books = 2
     session.bulk_save_objects(BookFactory.create_batch(3, year=1950))
     session.bulk_save_objects(
-        BookFactory.create_batch(2, year=1983, title='A Cor da Magia')
+        BookFactory.create_batch(
+            2,
+            year=1983,
+            title='A Cor da Magia',
+            author_id=factory.Sequence(lambda n: n),
+        )
     )
 
     session.commit()
@@ -99,6 +147,57 @@ def test_list_books_filter_title_and_year_should_return_2_books(
     assert len(response.json()['books']) == expected_books
 
 
+def test_list_books_cursor_pagination(session, client):
+    session.bulk_save_objects(BookFactory.create_batch(5))
+    session.commit()
+
+    response = client.get('/books/?limit=2')
+    first_page = response.json()
+    assert [book['id'] for book in first_page['books']] == [1, 2]
+
+    response = client.get(
+        f'/books/?limit=2&cursor={first_page["next_cursor"]}'
+    )
+    second_page = response.json()
+    assert [book['id'] for book in second_page['books']] == [3, 4]
+
+    response = client.get(
+        f'/books/?limit=2&cursor={second_page["next_cursor"]}'
+    )
+    assert [book['id'] for book in response.json()['books']] == [5]
+    assert 'next_cursor' not in response.json()
+
+
+def test_list_books_cursor_keeps_filters(session, client):
+    session.bulk_save_objects(BookFactory.create_batch(3, year=1950))
+    session.bulk_save_objects(BookFactory.create_batch(2, year=1999))
+    session.commit()
+
+    response = client.get('/books/?year=1999&limit=1')
+    cursor = response.json()['next_cursor']
+
+    response = client.get(f'/books/?limit=5&cursor={cursor}')
+    books = response.json()['books']
+    assert len(books) == 1
+    assert books[0]['year'] == 1999  # noqa: PLR2004
+
+
+def test_list_books_forged_cursor_400(client):
+    for payload in ({'id': 0, 'title': 5}, {'id': 2**70}):
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode())
+
+        response = client.get('/books/', params={'cursor': cursor.decode()})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_list_books_invalid_cursor_400(client):
+    response = client.get('/books/?cursor=invalid')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
 def test_create_book(client, author, token):
     response = client.post(
         '/books/',
@@ -204,6 +303,31 @@ def test_patch_book_conflict_409(client, token, book):
     }
 
 
+def test_patch_book_concurrent_duplicate_409(
+    client, session, token, book, monkeypatch
+):
+    # Another writer takes the title after the duplicate check ran.
+    monkeypatch.setattr(
+        'fast.routers.books.book_patch_query',
+        lambda book_id, book: select(
+            Book, literal(False), literal(True)
+        ).where(Book.id == book_id),
+    )
+    session.add(Book(year=1949, title='1984', author_id=1))
+    session.commit()
+
+    response = client.patch(
+        '/books/2',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'year': 1942, 'title': 'Fundação', 'author_id': 1},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {
+        'detail': 'Book from this author already exists'
+    }
+
+
 def test_patch_book_no_author_404(client, token, book):
     response = client.patch(
         f'/books/{book.id}',
@@ -249,3 +373,327 @@ def test_delete_book_not_found_404(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Book not found.'}
+
+
+def test_create_books_bulk(client, token, author, book):
+    response = client.post(
+        '/books/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'year': 1949, 'title': '1984', 'author_id': 1},
+            {'year': 1942, 'title': 'Fundação', 'author_id': 1},
+            {'year': 1945, 'title': 'A Revolução dos Bichos', 'author_id': 1},
+            {'year': 1949, 'title': '1984!', 'author_id': 1},
+            {'year': 1950, 'title': 'Eu, Robô', 'author_id': 2},
+            {'year': 1950, 'title': '   ', 'author_id': 1},
+        ],
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'books': [
+            {'year': 1949, 'title': '1984', 'author_id': 1, 'id': 2},
+            {
+                'year': 1945,
+                'title': 'a revolução dos bichos',
+                'author_id': 1,
+                'id': 3,
+            },
+        ],
+        'conflicts': [
+            {'index': 1, 'detail': 'Book from this author already exists'},
+            {'index': 3, 'detail': 'Book from this author already exists'},
+            {'index': 4, 'detail': 'Author does not exist in the database'},
+            {'index': 5, 'detail': 'Empty field'},
+        ],
+    }
+
+
+def test_create_books_bulk_empty_list(client, token):
+    response = client.post(
+        '/books/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[],
+    )
+    assert response.json() == {'books': [], 'conflicts': []}
+
+
+def test_export_books_ndjson(session, client):
+    session.bulk_save_objects(BookFactory.create_batch(3, year=1950))
+    session.commit()
+
+    response = client.get('/books/export')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = response.text.splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [1, 2, 3]
+    assert set(json.loads(lines[0])) == {'id', 'year', 'title', 'author_id'}
+
+
+def test_export_books_csv(client, book):
+    response = client.get('/books/export?format=csv')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert response.text.splitlines() == [
+        'id,year,title,author_id',
+        '1,1942,fundação,1',
+    ]
+
+
+def test_export_books_invalid_format_422(client):
+    response = client.get('/books/export?format=xml')
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_create_books_bulk_reports_concurrent_duplicates(
+    client, token, author, book, monkeypatch
+):
+    # Simulate another writer inserting 'fundação' after the duplicate check.
+    monkeypatch.setattr(
+        'fast.routers.books.existing_books_from_authors',
+        lambda session, keys: set(),
+    )
+
+    response = client.post(
+        '/books/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'year': 1942, 'title': 'Fundação', 'author_id': 1},
+            {'year': 1949, 'title': '1984', 'author_id': 1},
+        ],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'books': [{'year': 1949, 'title': '1984', 'author_id': 1, 'id': 2}],
+        'conflicts': [
+            {'index': 0, 'detail': 'Book from this author already exists'}
+        ],
+    }
+
+
+def test_import_books_skips_concurrent_duplicates(
+    client, token, author, book, monkeypatch
+):
+    monkeypatch.setattr(
+        'fast.importer.existing_books_from_authors',
+        lambda session, keys: set(),
+    )
+    content = '\n'.join(
+        json.dumps({'year': year, 'title': title, 'author_id': 1})
+        for year, title in ((1942, 'Fundação'), (1949, '1984'))
+    )
+
+    response = client.post(
+        '/books/import',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('books.ndjson', content.encode())},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['imported'] == 1
+    assert response.json()['skipped'] == 1
+
+
+def test_import_books_invalid_utf8_400(client, token, author, book):
+    client.get('/books/')
+    # Larger than the text decoder's read size, so the bad byte is only
+    # reached after earlier batches have been committed.
+    lines = [
+        json.dumps({
+            'year': 1900 + index,
+            'title': f'b{index}',
+            'author_id': 1,
+        })
+        for index in range(300)
+    ]
+    content = '\n'.join(lines).encode() + b'\n\xff\xfe{}\n'
+
+    response = client.post(
+        '/books/import?batch_size=100',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('books.ndjson', content)},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    detail = response.json()['detail']
+    assert detail['message'].startswith('Invalid import file')
+    assert detail['imported'] >= 100  # noqa: PLR2004
+    books = client.get('/books/').json()['books']
+    assert len(books) == detail['imported'] + 1
+
+
+def test_import_books_malformed_csv_400(client, token, author):
+    content = 'year,title,author_id\n1949,"' + 'x' * 200_000 + '",1\n'
+
+    response = client.post(
+        '/books/import?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('books.csv', content.encode())},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['detail']['imported'] == 0
+
+
+def test_import_books_ndjson(client, token, author, book):
+    lines = [
+        {'year': 1949, 'title': '1984', 'author': 'George Orwell'},
+        {'year': 1945, 'title': 'Animal Farm', 'author_id': 1},
+        {'year': 1942, 'title': 'Fundação', 'author_id': 1},
+        {'year': 1950, 'title': 'Eu, Robô', 'author': 'Isaac Asimov'},
+        {'year': 1949, 'title': '1984', 'author_id': 1},
+    ]
+    content = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+
+    response = client.post(
+        '/books/import?batch_size=2',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('books.ndjson', content.encode())},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    result = response.json()
+    assert result['imported'] == 2  # noqa: PLR2004
+    assert result['skipped'] == 4  # noqa: PLR2004
+    assert 'rows_per_second' in result
+
+    titles = [b['title'] for b in client.get('/books/').json()['books']]
+    assert titles == ['fundação', '1984', 'animal farm']
+
+
+def test_import_books_csv(client, token, author):
+    content = 'title,year,author\nA Revolução dos Bichos,1945,george orwell\n'
+
+    response = client.post(
+        '/books/import?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('books.csv', content.encode())},
+    )
+
+    assert response.json()['imported'] == 1
+    assert client.get('/books/1').json()['title'] == 'a revolução dos bichos'
+
+
+def test_read_book_is_served_from_cache(client, book):
+    first = client.get(f'/books/{book.id}')
+    second = client.get(f'/books/{book.id}')
+
+    assert second.json() == first.json()
+    assert 'desc="1 queries"' in first.headers['Server-Timing']
+    assert 'desc="0 queries"' in second.headers['Server-Timing']
+
+
+def test_patch_book_invalidates_cached_reads(client, token, author, book):
+    client.get(f'/books/{book.id}')
+    client.get('/books/')
+
+    client.patch(
+        f'/books/{book.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'Segunda Fundação', 'author_id': author.id},
+    )
+
+    assert client.get(f'/books/{book.id}').json()['title'] == (
+        'segunda fundação'
+    )
+    assert client.get('/books/').json()['books'][0]['title'] == (
+        'segunda fundação'
+    )
+
+
+def test_create_book_invalidates_cached_lists(client, token, author, book):
+    client.get(f'/books/{book.id}')
+    client.get('/books/?limit=10')
+
+    client.post(
+        '/books/',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'year': 1951, 'title': 'Eu, Robô', 'author_id': author.id},
+    )
+
+    second = client.get(f'/books/{book.id}')
+    assert 'desc="0 queries"' in second.headers['Server-Timing']
+    assert len(client.get('/books/?limit=10').json()['books']) == 2  # noqa: PLR2004
+
+
+def test_read_book_honors_if_none_match(client, token, author, book):
+    response = client.get(f'/books/{book.id}')
+    etag = response.headers['ETag']
+
+    not_modified = client.get(
+        f'/books/{book.id}', headers={'If-None-Match': etag}
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not not_modified.content
+    assert not_modified.headers['ETag'] == etag
+
+    client.patch(
+        f'/books/{book.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'Segunda Fundação', 'author_id': author.id},
+    )
+
+    modified = client.get(f'/books/{book.id}', headers={'If-None-Match': etag})
+    assert modified.status_code == HTTPStatus.OK
+    assert modified.headers['ETag'] != etag
+
+
+def test_read_book_honors_if_modified_since(client, book):
+    last_modified = client.get(f'/books/{book.id}').headers['Last-Modified']
+
+    response = client.get(
+        f'/books/{book.id}', headers={'If-Modified-Since': last_modified}
+    )
+    stale = client.get(
+        f'/books/{book.id}',
+        headers={'If-Modified-Since': 'Sat, 01 Jan 2000 00:00:00 GMT'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert stale.status_code == HTTPStatus.OK
+
+
+def test_list_books_uses_weak_etag(client, book):
+    response = client.get('/books/')
+    etag = response.headers['ETag']
+
+    not_modified = client.get('/books/', headers={'If-None-Match': etag})
+    by_date = client.get(
+        '/books/',
+        headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'},
+    )
+
+    assert etag.startswith('W/"')
+    assert 'Last-Modified' not in response.headers
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert by_date.status_code == HTTPStatus.OK
+
+
+def test_book_reads_do_not_load_entities(client, session, book):
+    session.expunge_all()
+
+    client.get('/books/')
+    client.get(f'/books/{book.id}')
+
+    assert not session.identity_map
+
+
+def test_patch_book_reads_back_with_returning(client, token, author, book):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.patch(
+        f'/books/{book.id}',
+        headers=headers,
+        json={'title': 'Fundação e Império', 'author_id': author.id},
+    )
+
+    response = client.patch(
+        f'/books/{book.id}',
+        headers=headers,
+        json={'year': 1952, 'title': 'Segunda Fundação', 'author_id': 1},
+    )
+
+    assert response.json()['year'] == 1952  # noqa: PLR2004
+    assert 'desc="2 queries"' in response.headers['Server-Timing']
+    assert book.updated_at is not None
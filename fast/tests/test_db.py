@@ -1,6 +1,25 @@
-from sqlalchemy import select
+from types import SimpleNamespace
 
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import IntegrityError
+
+from fast.database import (
+    BOOK_COLUMNS,
+    author_patch_query,
+    book_patch_query,
+    delete_author_cascade,
+    engine_options,
+    existing_author_names,
+    existing_books_from_authors,
+    prewarm_pool,
+    raise_user_integrity_error,
+)
 from fast.models import Author, Book, User
+from fast.schemas import AuthorUpdate, BookUpdate
+from fast.search import trigram_contains
+from fast.settings import Settings
 
 
 def test_create_user(session):
@@ -33,3 +52,157 @@ def test_create_book(session):
     book = session.scalar(select(Book).where(Book.title == 'Fundação'))
 
     assert book.title == 'Fundação'
+
+
+def test_search_index_tracks_book_changes(session):
+    book = Book(year=1942, title='fundação', author_id=1)
+    session.add(book)
+    session.commit()
+
+    query = select(Book).where(trigram_contains(Book.title, 'funda'))
+    assert session.scalars(query).all() == [book]
+
+    book.title = 'segunda'
+    session.commit()
+    assert session.scalars(query).all() == []
+    assert session.scalars(
+        select(Book).where(trigram_contains(Book.title, 'gun'))
+    ).all() == [book]
+
+    session.delete(book)
+    session.commit()
+    assert (
+        session.scalars(
+            select(Book).where(trigram_contains(Book.title, 'gun'))
+        ).all()
+        == []
+    )
+
+
+def test_search_index_short_terms(session):
+    session.add(Author(name='isaac asimov'))
+    session.commit()
+
+    authors = session.scalars(
+        select(Author).where(trigram_contains(Author.name, 'as'))
+    ).all()
+
+    assert [author.name for author in authors] == ['isaac asimov']
+
+
+def test_delete_author_cascade_removes_books_in_bulk(session):
+    author = Author(name='prolific')
+    other = Author(name='other')
+    session.add_all([author, other])
+    session.commit()
+    session.add_all([
+        Book(year=2000, title='first', author_id=author.id),
+        Book(year=2001, title='second', author_id=author.id),
+        Book(year=2002, title='kept', author_id=other.id),
+    ])
+    session.commit()
+
+    assert delete_author_cascade(session, author.id) == 1
+    assert delete_author_cascade(session, 999) == 0
+    session.commit()
+
+    assert session.scalars(select(Book.title)).all() == ['kept']
+    assert session.scalars(select(Author.name)).all() == ['other']
+
+
+class PostgresUniqueViolation(Exception):
+    def __init__(self, message, constraint_name):
+        super().__init__(message)
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+
+def test_user_integrity_error_uses_constraint_not_message():
+    orig = PostgresUniqueViolation(
+        'duplicate key value violates unique constraint "users_email_key"\n'
+        'DETAIL:  Key (email)=(username@x.com) already exists.',
+        'users_email_key',
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        raise_user_integrity_error(IntegrityError('INSERT', {}, orig))
+
+    assert exc_info.value.detail == 'Email already exists'
+
+
+def test_user_integrity_error_reraises_unknown_constraints():
+    exc = IntegrityError(
+        'INSERT', {}, Exception('NOT NULL constraint failed: users.password')
+    )
+
+    with pytest.raises(IntegrityError):
+        raise_user_integrity_error(exc)
+
+
+def test_engine_options_only_pass_configured_pool_settings():
+    settings = Settings(DB_POOL_SIZE=8, DB_POOL_PRE_PING=True)
+
+    assert engine_options(settings) == {
+        'pool_size': 8,
+        'pool_pre_ping': True,
+    }
+
+
+def test_prewarm_pool_opens_connections_up_to_pool_size(tmp_path):
+    engine = create_engine(
+        f'sqlite:///{tmp_path}/prewarm.db', pool_size=2, max_overflow=5
+    )
+
+    assert prewarm_pool(engine, 5) == 2  # noqa: PLR2004
+    assert engine.pool.checkedin() == 2  # noqa: PLR2004
+    assert engine.pool.checkedout() == 0
+
+
+def query_plan(session, statement):
+    sql = statement.compile(
+        session.get_bind(), compile_kwargs={'literal_binds': True}
+    )
+    return ' | '.join(
+        row[-1]
+        for row in session.connection().exec_driver_sql(
+            f'EXPLAIN QUERY PLAN {sql}'
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    ('statement', 'index'),
+    [
+        (
+            select(*BOOK_COLUMNS)
+            .where(Book.year == 1942)  # noqa: PLR2004
+            .order_by(Book.id),
+            'ix_books_year_id (year=?)',
+        ),
+        (
+            select(*BOOK_COLUMNS).where(Book.author_id == 1).order_by(Book.id),
+            'ix_books_author_id_id (author_id=?)',
+        ),
+        (
+            book_patch_query(1, BookUpdate(title='duna', author_id=1)),
+            'ix_books_author_id_title (author_id=? AND title=?)',
+        ),
+        (
+            author_patch_query(1, AuthorUpdate(name='frank herbert')),
+            'ix_authors_name (name=?)',
+        ),
+    ],
+)
+def test_hot_filters_use_indexes(session, statement, index):
+    plan = query_plan(session, statement)
+
+    assert index in plan
+    assert 'SCAN books' not in plan
+    assert 'SCAN authors' not in plan
+
+
+def test_duplicate_checks_search_unique_indexes(queries):
+    with queries.budget(2):
+        existing_books_from_authors(
+            queries.session, {('duna', 1), ('messias', 1)}
+        )
+        existing_author_names(queries.session, {'frank herbert'})
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import insert
+
+from fast.models import Author, Book
+
+
+def authorize(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+    return headers
+
+
+def test_read_book_and_author_by_id(client, queries, author, book):
+    with queries.budget(1):
+        client.get(f'/books/{book.id}')
+    with queries.budget(1):
+        client.get(f'/authors/{author.id}')
+
+
+def test_filtered_book_listings(client, queries, author, book):
+    with queries.budget(1):
+        client.get('/books/', params={'year': 1942, 'limit': 10})
+    with queries.budget(1):
+        client.get('/books/', params={'title': 'fund', 'limit': 10})
+    with queries.budget(2):
+        client.get(f'/authors/{author.id}/books', params={'limit': 10})
+
+
+def test_unfiltered_cursor_pages(client, session, queries, author):
+    session.add_all([
+        Book(year=1940 + index, title=f'book {index}', author_id=author.id)
+        for index in range(3)
+    ])
+    session.commit()
+    books = client.get('/books/', params={'limit': 1}).json()
+    authors = client.get('/authors/', params={'limit': 1}).json()
+
+    with queries.budget(1):
+        client.get(
+            '/books/', params={'limit': 1, 'cursor': books['next_cursor']}
+        )
+    with queries.budget(1):
+        client.get(
+            '/authors/', params={'limit': 1, 'cursor': authors['next_cursor']}
+        )
+
+
+def test_filtered_author_listing_with_books(client, queries, author, book):
+    with queries.budget(2):
+        client.get(
+            '/authors/',
+            params={'name': 'orwell', 'include': 'books', 'limit': 10},
+        )
+
+
+def test_book_writes_check_duplicates_with_indexes(
+    client, queries, token, author, book
+):
+    headers = authorize(client, token)
+
+    with queries.budget(1):
+        client.post(
+            '/books/',
+            headers=headers,
+            json={'year': 1949, 'title': '1984', 'author_id': author.id},
+        )
+    with queries.budget(2):
+        client.patch(
+            f'/books/{book.id}',
+            headers=headers,
+            json={'title': 'A Revolução dos Bichos', 'author_id': author.id},
+        )
+    with queries.budget(3):
+        client.post(
+            '/books/bulk',
+            headers=headers,
+            json=[
+                {'year': 1949, 'title': '1984', 'author_id': author.id},
+                {'year': 1938, 'title': 'Homenagem', 'author_id': author.id},
+            ],
+        )
+
+
+def test_author_writes_check_duplicates_with_indexes(
+    client, queries, token, author
+):
+    headers = authorize(client, token)
+
+    with queries.budget(1):
+        client.post('/authors/', headers=headers, json={'name': 'Huxley'})
+    with queries.budget(2):
+        client.patch(
+            f'/authors/{author.id}', headers=headers, json={'name': 'Orwell'}
+        )
+    with queries.budget(2):
+        client.post(
+            '/authors/bulk',
+            headers=headers,
+            json=[{'name': 'Orwell'}, {'name': 'Bradbury'}],
+        )
+
+
+def test_budget_counts_executemany_statements(session, queries):
+    with pytest.raises(AssertionError, match='1 queries over a budget of 0'):
+        with queries.budget(0):
+            session.execute(insert(Author), [{'name': 'a'}, {'name': 'b'}])
@@ -1,8 +1,24 @@
+import asyncio
+import time
 from http import HTTPStatus
+from threading import Semaphore
+from types import SimpleNamespace
 
+from httpx import ASGITransport, AsyncClient
 from jwt import decode
+from sqlalchemy import event
 
-from fast.security import create_access_token, settings
+from fast.app import app
+from fast.database import get_session
+from fast.security import (
+    HashWorkerPool,
+    check_password,
+    create_access_token,
+    hash_password,
+    hash_pool,
+    password_context,
+    settings,
+)
 
 
 def test_jwt():
@@ -46,3 +62,107 @@ def test_current_user_not_username(client, user):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_current_user_lookups_do_not_serialize(user):
+    delay = 0.2
+    concurrent_requests = 5
+    token = create_access_token(data={'sub': user.email})
+
+    def slow_scalar(query):
+        time.sleep(delay)
+        return user
+
+    async def refresh_tokens():
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport, base_url='http://test'
+        ) as client:
+            return await asyncio.gather(*[
+                client.post(
+                    '/auth/refresh_token',
+                    headers={'Authorization': f'Bearer {token}'},
+                )
+                for _ in range(concurrent_requests)
+            ])
+
+    app.dependency_overrides[get_session] = lambda: SimpleNamespace(
+        scalar=slow_scalar
+    )
+    try:
+        start = time.perf_counter()
+        responses = asyncio.run(refresh_tokens())
+        elapsed = time.perf_counter() - start
+    finally:
+        app.dependency_overrides.clear()
+
+    assert all(r.status_code == HTTPStatus.OK for r in responses)
+    assert elapsed < delay * concurrent_requests / 2
+
+
+def test_low_cost_hashes_verify_with_recommended_context():
+    hashed = password_context(low_cost=True).hash('secret')
+
+    assert password_context().verify('secret', hashed)
+    assert not password_context().verify('other', hashed)
+
+
+def test_hash_pool_runs_jobs_in_worker_process():
+    pool = HashWorkerPool(workers=1, max_pending=2, retry_after=1)
+    pool.start()
+    try:
+        hashed = pool.run(hash_password, 'secret')
+        assert pool.run(check_password, 'secret', hashed)
+    finally:
+        pool.shutdown()
+
+
+def test_hash_pool_saturated_503(client, monkeypatch):
+    monkeypatch.setattr(hash_pool, 'executor', object())
+    monkeypatch.setattr(hash_pool, 'slots', Semaphore(0))
+
+    response = client.post(
+        '/users',
+        json={
+            'username': 'user',
+            'email': 'email@example.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == str(hash_pool.retry_after)
+    assert response.json() == {'detail': 'Server busy, try again later'}
+
+
+def test_current_user_cached_between_requests(client, session, token):
+    statements = []
+    event.listen(
+        session.bind,
+        'before_cursor_execute',
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    for _ in range(2):
+        response = client.post(
+            '/auth/refresh_token',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    assert len([s for s in statements if 'FROM users' in s]) == 1
+
+
+def test_current_user_cache_invalidated_on_patch(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    response = client.patch(
+        f'/users/{user.id}',
+        headers=headers,
+        json={'email': 'updated@example.com'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.post('/auth/refresh_token', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -60,6 +60,24 @@ def test_create_user_existing_email_409(client, user):
     assert response.json() == {'detail': 'Email already exists'}
 
 
+def test_create_user_duplicate_skips_password_hash(client, user, monkeypatch):
+    def fail(password):
+        raise AssertionError('hashed a duplicate signup')
+
+    monkeypatch.setattr('fast.routers.users.get_password_hash', fail)
+
+    response = client.post(
+        '/users',
+        json={
+            'username': 'other_test',
+            'email': user.email,
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
 def test_read_users(client):
     response = client.get('/users')
     assert response.status_code == HTTPStatus.OK
@@ -140,6 +158,56 @@ def test_patch_user_email(client, user, token):
     }
 
 
+def test_patch_user_without_password(client, user, token):
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'email': 'updated@example.com'},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['email'] == 'updated@example.com'
+
+
+def test_patch_user_concurrent_duplicate_409(
+    client, user, other_user, token, monkeypatch
+):
+    monkeypatch.setattr(
+        'fast.routers.users.check_existing_users_patch',
+        lambda session, user: None,
+    )
+
+    response = client.patch(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'email': other_user.email},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Email already exists'}
+
+
+def test_update_user_concurrent_duplicate_409(
+    client, user, other_user, token, monkeypatch
+):
+    monkeypatch.setattr(
+        'fast.routers.users.check_existing_users',
+        lambda session, user: None,
+    )
+
+    response = client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': other_user.username,
+            'email': 'updated@example.com',
+            'password': 'secret',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Username already exists'}
+
+
 def test_update_user_empty_string_400(client, user, token):
     response = client.put(
         f'/users/{user.id}',
@@ -304,3 +372,13 @@ def test_delete_user_wrong_user_400(client, other_user, token):
     )
     assert response.status_code == HTTPStatus.BAD_REQUEST
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_user_reads_do_not_load_entities(client, session, user):
+    session.expunge_all()
+
+    users = client.get('/users/').json()['users']
+    single = client.get(f'/users/{user.id}').json()
+
+    assert users == [single]
+    assert not session.identity_map
@@ -1,4 +1,29 @@
-from fast.utils.sanitize import sanitize
+import base64
+import json
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+from freezegun import freeze_time
+
+from fast.caching import ResponseCache, cache_requests
+from fast.metrics import Gauge, Histogram
+from fast.utils.cache import TTLCache
+from fast.utils.conditional import (
+    content_etag,
+    etag_matches,
+    is_not_modified,
+)
+from fast.utils.cursor import decode_cursor, encode_cursor
+from fast.utils.sanitize import (
+    SANITIZE_CACHE_MAX_LENGTH,
+    cached_normalize,
+    normalize,
+    sanitize,
+)
+from fast.utils.serialize import dumps, page_payload
+
+Row = namedtuple('Row', ['id', 'title'])
 
 
 def test_sanitize():
@@ -9,3 +34,189 @@ def test_sanitize():
 def test_sanitize_empty_string():
     sanitized = sanitize('      ')
     assert not sanitized
+
+
+def test_sanitize_matches_per_character_filter_for_every_code_point():
+    def reference(string):
+        alpha = ''.join(
+            char for char in string if char.isalnum() or char.isspace()
+        )
+        return ' '.join(alpha.split()).lower()
+
+    for start in range(0, sys.maxunicode + 1, 4096):
+        chunk = ''.join(
+            map(chr, range(start, min(start + 4096, sys.maxunicode + 1)))
+        )
+        for string in (chunk, chunk[:128], f'A_b-c {chunk[:64]} İ'):
+            assert normalize(string) == reference(string), start
+
+
+def test_sanitize_mixed_titles():
+    assert sanitize("  Orwell's  1984:  ") == 'orwells 1984'
+    assert sanitize('Fundação — Über_Naïve!') == 'fundação übernaïve'
+    assert sanitize('snake_case\tand\u00a0nbsp') == 'snakecase and nbsp'
+
+
+def test_sanitize_memoizes_repeated_inputs():
+    cached_normalize.cache_clear()
+
+    sanitize('Repeated Title!')
+    sanitize('Repeated Title!')
+
+    assert cached_normalize.cache_info().hits == 1
+
+
+def test_sanitize_does_not_memoize_long_inputs():
+    cached_normalize.cache_clear()
+    long_title = 'Long Title! ' * SANITIZE_CACHE_MAX_LENGTH
+
+    assert sanitize(long_title) == normalize(long_title)
+    assert cached_normalize.cache_info().currsize == 0
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(10, title='fundação', year=None)
+    assert decode_cursor(cursor) == {'id': 10, 'title': 'fundação'}
+
+
+def test_decode_cursor_invalid():
+    assert decode_cursor('not-a-cursor') is None
+
+
+def forge_cursor(payload):
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def test_decode_cursor_rejects_forged_payloads():
+    for payload in (
+        {'id': 0, 'title': 5},
+        {'id': 0, 'name': ['x']},
+        {'id': 0, 'year': '1942'},
+        {'id': 2**70},
+        {'id': True},
+        {'id': 0, 'other': 'x'},
+        {'title': 'x'},
+        [0],
+    ):
+        assert decode_cursor(forge_cursor(payload)) is None, payload
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3  # noqa: PLR2004
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=60)
+    with freeze_time('2023-07-14 12:00:00'):
+        cache.set('a', 1, ttl=10)
+
+    with freeze_time('2023-07-14 12:00:11'):
+        assert cache.get('a') is None
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('latency', 'Latency.', ('route',), (0.1, 1.0))
+
+    histogram.observe(0.05, ('/books',))
+    histogram.observe(0.5, ('/books',))
+    histogram.observe(5.0, ('/books',))
+
+    lines = histogram.render().splitlines()
+    assert lines[2:] == [
+        'latency_bucket{route="/books",le="0.1"} 1',
+        'latency_bucket{route="/books",le="1.0"} 2',
+        'latency_bucket{route="/books",le="+Inf"} 3',
+        'latency_sum{route="/books"} 5.55',
+        'latency_count{route="/books"} 3',
+    ]
+
+
+def test_gauge_tracks_increments_and_decrements():
+    gauge = Gauge('in_flight', 'In flight.')
+
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert gauge.render().splitlines()[-1] == 'in_flight 1'
+
+
+def test_response_cache_generation_invalidates_scope():
+    cache = ResponseCache(TTLCache(maxsize=10, ttl=60))
+    calls = []
+
+    def render():
+        calls.append(1)
+        return f'body{len(calls)}'
+
+    assert cache.fetch('books:list', {'limit': 5, 'title': None}, render) == (
+        'body1'
+    )
+    assert cache.fetch('books:list', {'limit': 5}, render) == 'body1'
+    assert cache.fetch('books:list', {'limit': 6}, render) == 'body2'
+
+    cache.invalidate('books:list')
+
+    assert cache.fetch('books:list', {'limit': 5}, render) == 'body3'
+
+
+def test_response_cache_counts_hits_and_misses():
+    cache = ResponseCache(TTLCache(maxsize=10, ttl=60))
+    before = cache_requests.samples()
+
+    cache.fetch('authors:1', {}, lambda: 'body')
+    cache.fetch('authors:1', {}, lambda: 'body')
+
+    after = cache_requests.samples()
+    for result in ('hit', 'miss'):
+        key = ('authors', result)
+        assert after[key] - before.get(key, 0) == 1
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = content_etag(b'{}')
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_is_not_modified_prefers_if_none_match():
+    last_modified = datetime(2024, 1, 1, 12, 0, 0)
+    headers = {
+        'if-none-match': '"other"',
+        'if-modified-since': 'Mon, 01 Jan 2024 12:00:00 GMT',
+    }
+
+    assert not is_not_modified(headers, '"tag"', last_modified)
+    assert is_not_modified(
+        {'if-modified-since': headers['if-modified-since']},
+        '"tag"',
+        last_modified,
+    )
+    assert not is_not_modified(
+        {'if-modified-since': 'not a date'}, '"tag"', last_modified
+    )
+
+
+def test_page_payload_maps_rows_and_skips_empty_cursor():
+    rows = [Row(id=1, title='a'), Row(id=2, title='b')]
+
+    assert page_payload('books', rows) == {
+        'books': [{'id': 1, 'title': 'a'}, {'id': 2, 'title': 'b'}]
+    }
+    assert page_payload('books', [], 'abc') == {
+        'books': [],
+        'next_cursor': 'abc',
+    }
+    assert dumps({'title': 'fundação'}) == '{"title":"fundação"}'.encode()